@@ -3,12 +3,16 @@
 
 param(
     [string]$TestFile = "",
-    [switch]$Verbose
+    [switch]$Verbose,
+    [switch]$Parallel
 )
 
 $env:PYTHONPATH = "src"
 
-if ($TestFile) {
+if ($Parallel) {
+    # Requires pytest-xdist (pip install -e .[test])
+    python -m pytest -n auto
+} elseif ($TestFile) {
     if ($Verbose) {
         python -m unittest discover -s tests -p "$TestFile" -v
     } else {
@@ -6,10 +6,16 @@ Provides blunder detection, critical position analysis, and game statistics.
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from chess_metrics.web.profiling import profile_function, profile_section
 
+# Column order of metrics_matrix(): white/black pairs, so [0::2] are white's
+# PV/MV/OV/DV and [1::2] are black's
+METRIC_KEYS = ('pv_w', 'pv_b', 'mv_w', 'mv_b', 'ov_w', 'ov_b', 'dv_w', 'dv_b')
+METRIC_NAMES = ('PV', 'MV', 'OV', 'DV')
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Blunder:
     """Represents a blunder (poor move) in a game."""
     ply: int
@@ -22,7 +28,7 @@ class Blunder:
     severity: str  # 'blunder', 'mistake', 'inaccuracy'
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CriticalPosition:
     """Represents a critical position in the game."""
     ply: int
@@ -32,7 +38,7 @@ class CriticalPosition:
     metrics: Dict[str, float]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GameStatistics:
     """Aggregate statistics for a game."""
     total_moves: int
@@ -53,6 +59,23 @@ class GameStatistics:
     turning_points: List[int]  # ply numbers
 
 
+def metrics_matrix(positions: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Extract the eight metric columns of a game in one pass.
+
+    Returns a float64 array of shape (len(positions), 8) in METRIC_KEYS order.
+    Build it once and pass it to detect_blunders, find_critical_positions and
+    calculate_statistics so they work column-wise instead of re-reading the
+    position dicts.
+    """
+    return np.array([[p[k] for k in METRIC_KEYS] for p in positions],
+                    dtype=np.float64).reshape(len(positions), len(METRIC_KEYS))
+
+
+def _metrics_dict(pos: Dict[str, Any]) -> Dict[str, float]:
+    return {k: pos[k] for k in METRIC_KEYS}
+
+
 def assess_move_quality(delta: float) -> str:
     """
     Assess move quality based on metric delta.
@@ -79,7 +102,8 @@ def detect_blunders(
     positions: List[Dict[str, Any]],
     blunder_threshold: float = -15,
     mistake_threshold: float = -10,
-    inaccuracy_threshold: float = -5
+    inaccuracy_threshold: float = -5,
+    metrics: Optional[np.ndarray] = None
 ) -> List[Blunder]:
     """
     Detect blunders, mistakes, and inaccuracies in a game.
@@ -89,73 +113,57 @@ def detect_blunders(
         blunder_threshold: Delta threshold for blunders (default: -15)
         mistake_threshold: Delta threshold for mistakes (default: -10)
         inaccuracy_threshold: Delta threshold for inaccuracies (default: -5)
+        metrics: metrics_matrix(positions), if already built
     
     Returns:
         List of Blunder objects
     """
+    if len(positions) < 2:
+        return []
+    if metrics is None:
+        metrics = metrics_matrix(positions)
+
+    # Per move, the deltas of the four metrics of the side that moved
+    # (odd ply = white, even ply = black), in PV/MV/OV/DV order
+    plies = np.fromiter((p['ply'] for p in positions[1:]), dtype=np.int64, count=len(positions) - 1)
+    white = (plies % 2 == 1)[:, None]
+    deltas = np.diff(metrics, axis=0)
+    side_deltas = np.where(white, deltas[:, 0::2], deltas[:, 1::2])
+
+    # Worst metric per move (first one on ties); only losses can qualify
+    worst_idx = side_deltas.argmin(axis=1)
+    worst = side_deltas[np.arange(len(side_deltas)), worst_idx]
+    candidates = np.flatnonzero((worst < 0) & (worst <= inaccuracy_threshold))
+
     blunders = []
-    
-    for i in range(1, len(positions)):
-        prev_pos = positions[i - 1]
-        curr_pos = positions[i]
-        
+    for i, m in zip(candidates.tolist(), worst_idx[candidates].tolist()):
+        prev_pos = positions[i]
+        curr_pos = positions[i + 1]
         ply = curr_pos['ply']
-        san = curr_pos.get('last_move_san', '?')
-        
-        # Determine which side moved (odd ply = white, even ply = black)
         side = 'white' if ply % 2 == 1 else 'black'
-        
-        # Check each metric for the side that just moved
-        if side == 'white':
-            metrics_to_check = [
-                ('PV', prev_pos['pv_w'], curr_pos['pv_w']),
-                ('MV', prev_pos['mv_w'], curr_pos['mv_w']),
-                ('OV', prev_pos['ov_w'], curr_pos['ov_w']),
-                ('DV', prev_pos['dv_w'], curr_pos['dv_w']),
-            ]
-        else:
-            metrics_to_check = [
-                ('PV', prev_pos['pv_b'], curr_pos['pv_b']),
-                ('MV', prev_pos['mv_b'], curr_pos['mv_b']),
-                ('OV', prev_pos['ov_b'], curr_pos['ov_b']),
-                ('DV', prev_pos['dv_b'], curr_pos['dv_b']),
-            ]
-        
-        # Find the worst delta for this move
-        worst_delta = 0
-        worst_metric = None
-        worst_before = 0
-        worst_after = 0
-        
-        for metric_name, before, after in metrics_to_check:
-            delta = after - before
-            if delta < worst_delta:
-                worst_delta = delta
-                worst_metric = metric_name
-                worst_before = before
-                worst_after = after
-        
+        key = METRIC_KEYS[2 * m + (0 if side == 'white' else 1)]
+        before = prev_pos[key]
+        after = curr_pos[key]
+        delta = after - before
+
         # Categorize the move
-        if worst_delta <= blunder_threshold:
+        if delta <= blunder_threshold:
             severity = 'blunder'
-        elif worst_delta <= mistake_threshold:
+        elif delta <= mistake_threshold:
             severity = 'mistake'
-        elif worst_delta <= inaccuracy_threshold:
-            severity = 'inaccuracy'
         else:
-            continue  # Not a poor move
-        
-        if worst_metric:
-            blunders.append(Blunder(
-                ply=ply,
-                side=side,
-                san=san,
-                metric=worst_metric,
-                delta=worst_delta,
-                before=worst_before,
-                after=worst_after,
-                severity=severity
-            ))
+            severity = 'inaccuracy'
+
+        blunders.append(Blunder(
+            ply=ply,
+            side=side,
+            san=curr_pos.get('last_move_san', '?'),
+            metric=METRIC_NAMES[m],
+            delta=delta,
+            before=before,
+            after=after,
+            severity=severity
+        ))
     
     return blunders
 
@@ -163,7 +171,8 @@ def detect_blunders(
 def find_critical_positions(
     positions: List[Dict[str, Any]],
     peak_threshold: float = 40,
-    swing_threshold: float = 20
+    swing_threshold: float = 20,
+    metrics: Optional[np.ndarray] = None
 ) -> List[CriticalPosition]:
     """
     Find critical positions in the game.
@@ -172,78 +181,55 @@ def find_critical_positions(
         positions: List of position dictionaries with metrics
         peak_threshold: Threshold for peak metric values (default: 40)
         swing_threshold: Threshold for large metric swings (default: 20)
+        metrics: metrics_matrix(positions), if already built
 
     Returns:
         List of CriticalPosition objects
     """
+    if not positions:
+        return []
+    if metrics is None:
+        metrics = metrics_matrix(positions)
+
+    # Peak values, and large swings (turning points): max absolute delta
+    # across all metrics from the previous position
+    peak = metrics.max(axis=1) >= peak_threshold
+    swing = np.zeros(len(positions), dtype=bool)
+    swing[1:] = np.abs(np.diff(metrics, axis=0)).max(axis=1) >= swing_threshold
+
     critical = []
 
-    for i in range(len(positions)):
+    for i in np.flatnonzero(peak | swing).tolist():
         pos = positions[i]
         ply = pos['ply']
         fen = pos.get('fen', '')
         san = pos.get('last_move_san', 'start')
 
-        # Check for peak values
-        max_metric = max(
-            pos['pv_w'], pos['pv_b'],
-            pos['mv_w'], pos['mv_b'],
-            pos['ov_w'], pos['ov_b'],
-            pos['dv_w'], pos['dv_b']
-        )
-
-        if max_metric >= peak_threshold:
+        if peak[i]:
             critical.append(CriticalPosition(
                 ply=ply,
                 fen=fen,
                 san=san,
                 reason='peak_value',
-                metrics={
-                    'pv_w': pos['pv_w'], 'pv_b': pos['pv_b'],
-                    'mv_w': pos['mv_w'], 'mv_b': pos['mv_b'],
-                    'ov_w': pos['ov_w'], 'ov_b': pos['ov_b'],
-                    'dv_w': pos['dv_w'], 'dv_b': pos['dv_b'],
-                }
+                metrics=_metrics_dict(pos)
             ))
 
-        # Check for large swings (turning points)
-        if i > 0:
-            prev_pos = positions[i - 1]
-
-            # Calculate max absolute delta across all metrics
-            deltas = [
-                abs(pos['pv_w'] - prev_pos['pv_w']),
-                abs(pos['pv_b'] - prev_pos['pv_b']),
-                abs(pos['mv_w'] - prev_pos['mv_w']),
-                abs(pos['mv_b'] - prev_pos['mv_b']),
-                abs(pos['ov_w'] - prev_pos['ov_w']),
-                abs(pos['ov_b'] - prev_pos['ov_b']),
-                abs(pos['dv_w'] - prev_pos['dv_w']),
-                abs(pos['dv_b'] - prev_pos['dv_b']),
-            ]
-
-            max_swing = max(deltas)
-
-            if max_swing >= swing_threshold:
-                critical.append(CriticalPosition(
-                    ply=ply,
-                    fen=fen,
-                    san=san,
-                    reason='turning_point',
-                    metrics={
-                        'pv_w': pos['pv_w'], 'pv_b': pos['pv_b'],
-                        'mv_w': pos['mv_w'], 'mv_b': pos['mv_b'],
-                        'ov_w': pos['ov_w'], 'ov_b': pos['ov_b'],
-                        'dv_w': pos['dv_w'], 'dv_b': pos['dv_b'],
-                    }
-                ))
+        if swing[i]:
+            critical.append(CriticalPosition(
+                ply=ply,
+                fen=fen,
+                san=san,
+                reason='turning_point',
+                metrics=_metrics_dict(pos)
+            ))
 
     return critical
 
 
 def calculate_statistics(
     positions: List[Dict[str, Any]],
-    blunders: List[Blunder]
+    blunders: List[Blunder],
+    metrics: Optional[np.ndarray] = None
 ) -> GameStatistics:
     """
     Calculate aggregate statistics for a game.
@@ -251,6 +237,7 @@ def calculate_statistics(
     Args:
         positions: List of position dictionaries with metrics
         blunders: List of detected blunders
+        metrics: metrics_matrix(positions), if already built
 
     Returns:
         GameStatistics object
@@ -276,16 +263,14 @@ def calculate_statistics(
     white_inaccuracies = sum(1 for b in blunders if b.side == 'white' and b.severity == 'inaccuracy')
     black_inaccuracies = sum(1 for b in blunders if b.side == 'black' and b.severity == 'inaccuracy')
 
-    # Calculate averages
+    # Calculate averages (summed in position order, one column at a time)
+    if metrics is None:
+        metrics = metrics_matrix(positions)
     total = len(positions)
-    avg_pv_white = sum(p['pv_w'] for p in positions) / total
-    avg_pv_black = sum(p['pv_b'] for p in positions) / total
-    avg_mv_white = sum(p['mv_w'] for p in positions) / total
-    avg_mv_black = sum(p['mv_b'] for p in positions) / total
-    avg_ov_white = sum(p['ov_w'] for p in positions) / total
-    avg_ov_black = sum(p['ov_b'] for p in positions) / total
-    avg_dv_white = sum(p['dv_w'] for p in positions) / total
-    avg_dv_black = sum(p['dv_b'] for p in positions) / total
+    (avg_pv_white, avg_pv_black, avg_mv_white, avg_mv_black,
+     avg_ov_white, avg_ov_black, avg_dv_white, avg_dv_black) = (
+        sum(column) / total for column in metrics.T.tolist()
+    )
 
     # Find turning points (plies with blunders)
     turning_points = sorted(set(b.ply for b in blunders if b.severity == 'blunder'))
@@ -2,7 +2,6 @@
 import argparse
 import random
 import time
-import hashlib
 from datetime import datetime, timezone
 from dataclasses import dataclass
 from typing import Optional, List, Set
@@ -13,11 +12,12 @@ from chess_metrics.engine.apply import apply_move, undo_move
 from chess_metrics.engine.metrics import compute_metrics, deltas
 from chess_metrics.engine.search import choose_best_move, Profile, clear_transposition_table
 from chess_metrics.engine.san import move_to_san
-from chess_metrics.engine.types import WHITE, BLACK, sq_to_alg, alg_to_sq, Move
+from chess_metrics.engine.types import WHITE, BLACK, sq_to_alg, alg_to_sq, Move, CHAR_TO_PIECE
 from chess_metrics.db.repo import Repo
 from chess_metrics.pgn import export_game_to_pgn
 from chess_metrics.analysis import (
-    detect_blunders, find_critical_positions, calculate_statistics, generate_game_report
+    detect_blunders, find_critical_positions, calculate_statistics, generate_game_report,
+    metrics_matrix
 )
 
 START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
@@ -80,11 +80,26 @@ def analyze_moves(state, legal_moves, apply_variance=False):
 
     Returns list of tuples: (move, san, metrics_after_move, deltas_after_move, variance_factor)
     """
+    return analyze_moves_multi(state, legal_moves, (apply_variance,))[0]
+
+def analyze_moves_multi(state, legal_moves, variance_flags):
+    """Analyze all legal moves once for several variance settings.
+
+    Each move is applied and its metrics computed a single time; one result
+    tuple per flag is built from them.
+
+    Args:
+        state: Current board state
+        legal_moves: List of legal moves
+        variance_flags: One apply_variance flag per wanted result list
+
+    Returns one analyze_moves() result list per flag, in flag order.
+    """
     from chess_metrics.engine.apply import apply_move, undo_move
     from chess_metrics.engine.san import move_to_san
     from chess_metrics.engine.metrics import compute_metrics, deltas
 
-    move_analysis = []
+    analyses = [[] for _ in variance_flags]
 
     for move in legal_moves:
         # Get SAN notation
@@ -97,25 +112,24 @@ def analyze_moves(state, legal_moves, apply_variance=False):
         metrics = compute_metrics(state)
         metric_deltas = deltas(metrics)
 
-        # Generate variance factor
-        variance_factor = generate_variance() if apply_variance else 1.0
-
-        # Apply variance to deltas
-        if apply_variance:
-            dPV, dMV, dOV, dDV = metric_deltas
-            metric_deltas = (
-                dPV * variance_factor,
-                dMV * variance_factor,
-                dOV * variance_factor,
-                dDV * variance_factor
-            )
-
         # Undo the move
         undo_move(state, undo_info)
 
-        move_analysis.append((move, san, metrics, metric_deltas, variance_factor))
+        for apply_variance, move_analysis in zip(variance_flags, analyses):
+            if apply_variance:
+                # Apply a fresh variance factor to the deltas
+                variance_factor = generate_variance()
+                dPV, dMV, dOV, dDV = metric_deltas
+                move_analysis.append((move, san, metrics, (
+                    dPV * variance_factor,
+                    dMV * variance_factor,
+                    dOV * variance_factor,
+                    dDV * variance_factor
+                ), variance_factor))
+            else:
+                move_analysis.append((move, san, metrics, metric_deltas, 1.0))
 
-    return move_analysis
+    return analyses
 
 def display_move_options(state, legal_moves, player_name, player_side, apply_variance=False):
     """Display legal moves with their metrics.
@@ -216,14 +230,20 @@ class OpeningTracker:
             uniqueness_depth: Number of moves (plies) to use for uniqueness check
         """
         self.uniqueness_depth = uniqueness_depth
-        self.seen_openings: Set[str] = set()
+        self.seen_openings: Set[int] = set()
         self.duplicate_count = 0
 
-    def get_opening_signature(self, moves: List[str]) -> str:
-        """Generate hash signature from first N moves."""
-        opening_moves = moves[:self.uniqueness_depth]
-        signature = "|".join(opening_moves)
-        return hashlib.md5(signature.encode()).hexdigest()
+    def get_opening_signature(self, moves: List[str]) -> int:
+        """
+        Pack the first N UCI moves into one int key, 16 bits per move
+        (from_sq:6 | to_sq:6 | promotion kind:4), so the set hashes a machine
+        int instead of a string.
+        """
+        key = 0
+        for uci in moves[:self.uniqueness_depth]:
+            promo = abs(CHAR_TO_PIECE[uci[4]]) if len(uci) > 4 else 0
+            key = (key << 16) | (alg_to_sq(uci[:2]) << 10) | (alg_to_sq(uci[2:4]) << 4) | promo
+        return key
 
     def is_duplicate(self, moves: List[str]) -> bool:
         """Check if this opening has been seen before."""
@@ -363,7 +383,7 @@ def play_interactive_game(repo: Repo, args):
         else:
             # AI player
             print(f"\n{current_name} (AI) is thinking...")
-            move = choose_best_move(state, ai_profile, args.ai_depth)
+            move = choose_best_move(state, ai_profile, args.ai_depth, parallel=args.parallel)
             if move is None:
                 print("AI has no legal moves!")
                 break
@@ -433,7 +453,8 @@ def play_silent_game(
     max_moves: int = 200,
     start_fen: str = START_FEN,
     white_name: str = "White",
-    black_name: str = "Black"
+    black_name: str = "Black",
+    parallel: bool = False
 ) -> GameResult:
     """
     Play a complete AI vs AI game silently (no display) and save to database.
@@ -447,9 +468,13 @@ def play_silent_game(
         start_fen: Starting position
         white_name: Name for white player
         black_name: Name for black player
+        parallel: Search root moves in worker processes
 
     Returns:
         GameResult with game statistics
+
+    Positions and moves are buffered in memory and written with executemany
+    in a single transaction together with the final result.
     """
     # Clear transposition table for new game
     clear_transposition_table()
@@ -465,16 +490,27 @@ def play_silent_game(
     state = parse_fen(start_fen)
     ply = 0
     opening_moves = []
+    position_rows = []
+    move_rows = []
+
+    def finish(result: str, termination: str) -> GameResult:
+        with repo.conn:
+            repo.insert_positions_many(position_rows)
+            repo.insert_moves_many(move_rows)
+            repo.conn.execute(
+                "UPDATE games SET result=?, termination=? WHERE game_id=?",
+                (result, termination, game_id)
+            )
+        return GameResult(game_id, ply, result, termination, opening_moves)
 
     # Save initial position
     met = compute_metrics(state)
-    repo.insert_position(
+    position_rows.append((
         game_id, ply, "W" if state.side_to_move == WHITE else "B",
         start_fen, None, None,
         met.pv_w, met.mv_w, met.ov_w, met.dv_w,
         met.pv_b, met.mv_b, met.ov_b, met.dv_b
-    )
-    repo.commit()
+    ))
 
     # Game loop
     while ply < max_moves:
@@ -489,26 +525,15 @@ def play_silent_game(
                 # Someone won - it's checkmate
                 termination = "checkmate"
 
-            repo.conn.execute(
-                "UPDATE games SET result=?, termination=? WHERE game_id=?",
-                (result, termination, game_id)
-            )
-            repo.commit()
-            return GameResult(game_id, ply, result, termination, opening_moves)
+            return finish(result, termination)
 
         # Get AI move
         current_profile = white_profile if state.side_to_move == WHITE else black_profile
-        move = choose_best_move(state, current_profile, depth)
+        move = choose_best_move(state, current_profile, depth, parallel=parallel)
 
         if move is None:
             # No legal moves (shouldn't happen if is_game_over works correctly)
-            result = "1/2-1/2"
-            repo.conn.execute(
-                "UPDATE games SET result=?, termination=? WHERE game_id=?",
-                (result, "stalemate", game_id)
-            )
-            repo.commit()
-            return GameResult(game_id, ply, result, "stalemate", opening_moves)
+            return finish("1/2-1/2", "stalemate")
 
         # Get SAN notation
         san = move_to_san(state, move)
@@ -529,7 +554,7 @@ def play_silent_game(
         # Save move to database
         from_alg = sq_to_alg(move.from_sq)
         to_alg = sq_to_alg(move.to_sq)
-        repo.insert_move(
+        move_rows.append((
             game_id, ply, move.uci(), san, from_alg, to_alg,
             1 if (move.is_capture or move.is_ep) else 0,
             1 if move.is_ep else 0,
@@ -537,26 +562,19 @@ def play_silent_game(
             1 if move.is_promotion else 0,
             "Q" if move.is_promotion else None,
             variance_factor
-        )
+        ))
 
         # Save new position
         fen = to_fen(state)
-        repo.insert_position(
+        position_rows.append((
             game_id, ply, "W" if state.side_to_move == WHITE else "B",
             fen, move.uci(), san,
             met.pv_w, met.mv_w, met.ov_w, met.dv_w,
             met.pv_b, met.mv_b, met.ov_b, met.dv_b
-        )
-        repo.commit()
+        ))
 
     # Max moves reached - draw
-    result = "1/2-1/2"
-    repo.conn.execute(
-        "UPDATE games SET result=?, termination=? WHERE game_id=?",
-        (result, "max_moves", game_id)
-    )
-    repo.commit()
-    return GameResult(game_id, ply, result, "max_moves", opening_moves)
+    return finish("1/2-1/2", "max_moves")
 
 def generate_batch_games(
     repo: Repo,
@@ -568,7 +586,8 @@ def generate_batch_games(
     max_moves: int = 200,
     uniqueness_depth: int = 6,
     max_retries: int = 20,
-    quiet: bool = False
+    quiet: bool = False,
+    parallel: bool = False
 ) -> BatchResult:
     """
     Generate multiple unique games in batch mode.
@@ -584,12 +603,18 @@ def generate_batch_games(
         uniqueness_depth: Number of plies to check for uniqueness
         max_retries: Maximum attempts to generate unique game
         quiet: If True, minimal output
+        parallel: Search root moves in worker processes
 
     Returns:
         BatchResult with statistics
     """
     start_time = time.time()
     tracker = OpeningTracker(uniqueness_depth)
+
+    # Each game is one write transaction; WAL + synchronous=NORMAL makes that
+    # a single WAL append rather than a journal fsync round trip
+    repo.conn.execute("PRAGMA journal_mode=WAL")
+    repo.conn.execute("PRAGMA synchronous=NORMAL")
     profile_distribution = {}
 
     all_profiles = ["default", "offense-first", "defense-first", "board-coverage", "materialist"]
@@ -627,16 +652,13 @@ def generate_batch_games(
             # Play game
             result = play_silent_game(
                 repo, white_profile, black_profile, depth, max_moves,
-                START_FEN, f"W_{white_prof_name}", f"B_{black_prof_name}"
+                START_FEN, f"W_{white_prof_name}", f"B_{black_prof_name}", parallel
             )
 
             # Check uniqueness
             if tracker.is_duplicate(result.opening_moves):
                 # Duplicate - delete game and retry
-                repo.conn.execute("DELETE FROM positions WHERE game_id=?", (result.game_id,))
-                repo.conn.execute("DELETE FROM moves WHERE game_id=?", (result.game_id,))
-                repo.conn.execute("DELETE FROM games WHERE game_id=?", (result.game_id,))
-                repo.commit()
+                repo.delete_game(result.game_id)
                 retry_count += 1
             else:
                 # Unique game!
@@ -708,6 +730,7 @@ def main():
     ai.add_argument("--fen", default=START_FEN)
     ai.add_argument("--depth", type=int, default=3)
     ai.add_argument("--profile", default="default")
+    ai.add_argument("--parallel", action="store_true", help="Search root moves in worker processes")
 
     pg = sub.add_parser("play-game")
     pg.add_argument("--white", default="White", help="White player name")
@@ -717,6 +740,7 @@ def main():
     pg.add_argument("--ai-depth", type=int, default=3, help="AI search depth")
     pg.add_argument("--ai-profile", default="default", help="AI profile")
     pg.add_argument("--start-fen", default=START_FEN, help="Starting position FEN")
+    pg.add_argument("--parallel", action="store_true", help="Search AI root moves in worker processes")
 
     gg = sub.add_parser("generate-games", help="Generate multiple games in batch mode")
     gg.add_argument("--count", type=int, required=True, help="Number of unique games to generate")
@@ -728,6 +752,7 @@ def main():
     gg.add_argument("--uniqueness-depth", type=int, default=6, help="Number of plies to check for uniqueness (default: 6)")
     gg.add_argument("--max-retries", type=int, default=20, help="Max attempts to generate unique game (default: 20)")
     gg.add_argument("--quiet", action="store_true", help="Minimal output")
+    gg.add_argument("--parallel", action="store_true", help="Search root moves in worker processes")
 
     ep = sub.add_parser("export-pgn", help="Export game(s) to PGN format")
     ep.add_argument("--game-id", type=int, help="Game ID to export (omit to export all games)")
@@ -747,6 +772,8 @@ def main():
     sv.add_argument("--port", type=int, default=5000, help="Port to run server on (default: 5000)")
     sv.add_argument("--host", default="127.0.0.1", help="Host to bind to (default: 127.0.0.1)")
     sv.add_argument("--debug", action="store_true", help="Run in debug mode")
+    sv.add_argument("--pool-size", type=int, default=4,
+                    help="Read-only DB connections shared by request threads (default: 4)")
 
     args = ap.parse_args()
     repo = Repo.open(args.db)
@@ -806,7 +833,7 @@ def main():
             "materialist": Profile("materialist", 2,1,1,1),
         }.get(args.profile, Profile(args.profile, 1,1,1,1))
 
-        mv = choose_best_move(st, prof, args.depth)
+        mv = choose_best_move(st, prof, args.depth, parallel=args.parallel)
         if mv is None:
             print("NO_MOVE")
             repo.close()
@@ -846,7 +873,8 @@ def main():
             max_moves=args.max_moves,
             uniqueness_depth=args.uniqueness_depth,
             max_retries=args.max_retries,
-            quiet=args.quiet
+            quiet=args.quiet,
+            parallel=args.parallel
         )
 
         repo.close()
@@ -935,16 +963,18 @@ def main():
             return
 
         # Perform analysis
+        metrics = metrics_matrix(positions)
         blunders = detect_blunders(
             positions,
             blunder_threshold=args.blunder_threshold,
             mistake_threshold=args.mistake_threshold,
-            inaccuracy_threshold=args.inaccuracy_threshold
+            inaccuracy_threshold=args.inaccuracy_threshold,
+            metrics=metrics
         )
 
-        critical_positions = find_critical_positions(positions)
+        critical_positions = find_critical_positions(positions, metrics=metrics)
 
-        stats = calculate_statistics(positions, blunders)
+        stats = calculate_statistics(positions, blunders, metrics=metrics)
 
         # Generate report
         report = generate_game_report(
@@ -980,8 +1010,14 @@ def main():
         print(f"Server: http://{args.host}:{args.port}")
         print(f"Press Ctrl+C to stop")
 
-        app = create_app(args.db)
-        app.run(host=args.host, port=args.port, debug=args.debug)
+        # Bring older databases up to date (e.g. the game_analysis cache table)
+        repo.migrate()
+        repo.close()
+
+        # Requests are served on threads; sqlite3 releases the GIL while a query
+        # runs, so concurrent requests overlap their DB reads on pooled connections
+        app = create_app(args.db, pool_size=args.pool_size)
+        app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
 
         return
 
@@ -1,2 +1,3 @@
 ﻿from .schema import SCHEMA_SQL
 from .repo import Repo
+from .pool import RepoPool
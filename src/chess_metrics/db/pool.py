@@ -0,0 +1,102 @@
+"""
+Process-wide pool of Repo connections for the web app.
+
+Opening SQLite per request re-opens the database file (and WAL/SHM) and
+starts with a cold page cache every time. The pool keeps up to `size`
+read-only connections plus a single read-write connection alive for the
+life of the process.
+
+Every pooled connection is tuned on open (see PRAGMAS) and runs
+PRAGMA optimize when the pool is closed.
+"""
+from __future__ import annotations
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from .repo import Repo
+
+# Applied to every pooled connection: relaxed fsync (safe under WAL), in-memory
+# temp tables, 256 MB mmap, 64 MB page cache, and waiting on locks instead of
+# failing immediately.
+PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA busy_timeout=5000;
+"""
+
+
+def _tune(repo: Repo, read_only: bool) -> Repo:
+    if not read_only:
+        # WAL is persistent in the file; switching needs a writable connection
+        repo.conn.execute("PRAGMA journal_mode=WAL")
+    repo.conn.executescript(PRAGMAS)
+    return repo
+
+
+def _optimize_and_close(repo: Repo) -> None:
+    try:
+        repo.conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass  # e.g. a read-only connection that would need to write stats
+    repo.close()
+
+
+class RepoPool:
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[Repo]" = queue.LifoQueue(maxsize=size)
+        self._all: List[Repo] = []
+        self._lock = threading.Lock()
+        self._writer: Optional[Repo] = None
+        self._writer_lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> Repo:
+        """Check out a read-only Repo, opening one lazily while below `size`."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                repo = _tune(Repo.open(self.path, read_only=True, check_same_thread=False), read_only=True)
+                self._all.append(repo)
+                return repo
+        return self._idle.get(timeout=timeout)
+
+    def release(self, repo: Repo) -> None:
+        """Return a Repo obtained from acquire()."""
+        self._idle.put_nowait(repo)
+
+    @contextmanager
+    def reader(self) -> Iterator[Repo]:
+        repo = self.acquire()
+        try:
+            yield repo
+        finally:
+            self.release(repo)
+
+    @contextmanager
+    def writer(self) -> Iterator[Repo]:
+        """The single read-write Repo; writers are serialized."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = _tune(Repo.open(self.path, check_same_thread=False), read_only=False)
+            yield self._writer
+
+    def close(self) -> None:
+        """Run PRAGMA optimize on and close every pooled connection."""
+        with self._lock:
+            for repo in self._all:
+                _optimize_and_close(repo)
+            self._all.clear()
+            self._idle = queue.LifoQueue(maxsize=self.size)
+        with self._writer_lock:
+            if self._writer is not None:
+                _optimize_and_close(self._writer)
+                self._writer = None
@@ -2,6 +2,7 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 
 from .schema import SCHEMA_SQL
@@ -9,13 +10,40 @@ from chess_metrics.web.profiling import profile_function, profile_section
 
 UTCNOW = lambda: datetime.now(timezone.utc).isoformat(timespec="seconds")
 
+# Path for a private in-memory database (no file, journal or fsync)
+MEMORY_PATH = ":memory:"
+
+INSERT_POSITION_SQL = """INSERT INTO positions(
+     game_id, ply, side_to_move, fen, last_move_uci, last_move_san,
+     pv_w,mv_w,ov_w,dv_w, pv_b,mv_b,ov_b,dv_b, created_utc
+   ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+INSERT_MOVE_SQL = """INSERT INTO moves(
+     game_id, ply, uci, san, from_sq, to_sq,
+     is_capture, is_ep, is_castle, is_promotion, promotion_piece,
+     variance_factor, created_utc
+   ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
 @dataclass(frozen=True)
 class Repo:
     conn: sqlite3.Connection
 
     @staticmethod
-    def open(path: str) -> "Repo":
-        conn = sqlite3.connect(path)
+    def open(path: str, read_only: bool = False, check_same_thread: bool = True) -> "Repo":
+        """
+        Open a repository.
+
+        read_only opens the file with SQLite's mode=ro (the file must exist).
+        check_same_thread=False lets a pool hand the connection to other threads.
+        MEMORY_PATH opens a fresh in-memory database; read_only does not apply.
+        """
+        if path == MEMORY_PATH:
+            conn = sqlite3.connect(MEMORY_PATH, check_same_thread=check_same_thread)
+        elif read_only:
+            uri = Path(path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            conn = sqlite3.connect(path, check_same_thread=check_same_thread)
         conn.row_factory = sqlite3.Row
         return Repo(conn)
 
@@ -69,10 +97,7 @@ class Repo:
                         pv_w: float, mv_w: float, ov_w: float, dv_w: float,
                         pv_b: float, mv_b: float, ov_b: float, dv_b: float) -> None:
         self.conn.execute(
-            """INSERT INTO positions(
-                 game_id, ply, side_to_move, fen, last_move_uci, last_move_san,
-                 pv_w,mv_w,ov_w,dv_w, pv_b,mv_b,ov_b,dv_b, created_utc
-               ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+            INSERT_POSITION_SQL,
             (game_id, ply, side_to_move, fen, last_uci, last_san,
              pv_w, mv_w, ov_w, dv_w, pv_b, mv_b, ov_b, dv_b, UTCNOW())
         )
@@ -82,16 +107,37 @@ class Repo:
                     is_capture: int, is_ep: int, is_castle: int, is_promotion: int,
                     promotion_piece: Optional[str], variance_factor: Optional[float] = None) -> None:
         self.conn.execute(
-            """INSERT INTO moves(
-                 game_id, ply, uci, san, from_sq, to_sq,
-                 is_capture, is_ep, is_castle, is_promotion, promotion_piece,
-                 variance_factor, created_utc
-               ) VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+            INSERT_MOVE_SQL,
             (game_id, ply, uci, san, from_sq, to_sq,
              is_capture, is_ep, is_castle, is_promotion, promotion_piece,
              variance_factor, UTCNOW())
         )
 
+    def insert_positions_many(self, rows: List[Tuple]) -> None:
+        """
+        Insert many positions with one prepared statement. Each row holds the
+        insert_position arguments in order; created_utc is stamped once for
+        the batch. Does not commit.
+        """
+        now = UTCNOW()
+        self.conn.executemany(INSERT_POSITION_SQL, [(*row, now) for row in rows])
+
+    def insert_moves_many(self, rows: List[Tuple]) -> None:
+        """
+        Insert many moves with one prepared statement. Each row holds the
+        insert_move arguments in order (variance_factor included). Does not commit.
+        """
+        now = UTCNOW()
+        self.conn.executemany(INSERT_MOVE_SQL, [(*row, now) for row in rows])
+
+    def delete_game(self, game_id: int) -> None:
+        """Delete a game with its positions, moves and stored analysis, and commit."""
+        self.conn.execute("DELETE FROM game_analysis WHERE game_id=?", (game_id,))
+        self.conn.execute("DELETE FROM positions WHERE game_id=?", (game_id,))
+        self.conn.execute("DELETE FROM moves WHERE game_id=?", (game_id,))
+        self.conn.execute("DELETE FROM games WHERE game_id=?", (game_id,))
+        self.conn.commit()
+
     def commit(self) -> None:
         self.conn.commit()
 
@@ -168,6 +214,22 @@ class Repo:
 
         return {'game': game_data, 'moves': moves}
 
+    def list_games_summary(self) -> List[sqlite3.Row]:
+        """
+        Get one summary row per game (players, result, move count) in a single query.
+
+        Columns: game_id, white_name, black_name, result, termination, created_utc, move_count
+        """
+        return self.conn.execute(
+            """SELECT g.game_id, wp.name as white_name, bp.name as black_name,
+                      g.result, g.termination, g.created_utc,
+                      (SELECT COUNT(*) FROM moves m WHERE m.game_id = g.game_id) as move_count
+               FROM games g
+               JOIN players wp ON g.white_player_id = wp.player_id
+               JOIN players bp ON g.black_player_id = bp.player_id
+               ORDER BY g.game_id ASC"""
+        ).fetchall()
+
     def get_all_game_ids(self) -> List[int]:
         """Get list of all game IDs in database."""
         rows = self.conn.execute("SELECT game_id FROM games ORDER BY game_id ASC").fetchall()
@@ -181,6 +243,36 @@ class Repo:
         ).fetchall()
         return [row['game_id'] for row in rows]
 
+    def positions_version(self, game_id: int) -> Tuple[int, int]:
+        """
+        Cheap change token for a game's positions: (row count, max rowid).
+
+        Any insert or replacement of the game's positions changes it, so it
+        can key caches of data derived from get_game_for_analysis().
+        """
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM positions WHERE game_id = ?",
+            (game_id,)
+        ).fetchone()
+        return row[0], row[1]
+
+    def get_analysis_payload(self, game_id: int, version: Tuple[int, int]) -> Optional[bytes]:
+        """Stored analysis body for the game, or None if missing or stale."""
+        row = self.conn.execute(
+            """SELECT payload FROM game_analysis
+                WHERE game_id = ? AND positions_count = ? AND positions_rowid = ?""",
+            (game_id, version[0], version[1])
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_analysis_payload(self, game_id: int, version: Tuple[int, int], payload: bytes) -> None:
+        """Store (or replace) the analysis body computed for a positions version."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO game_analysis VALUES(?,?,?,?,?)",
+            (game_id, version[0], version[1], payload, UTCNOW())
+        )
+        self.conn.commit()
+
     @profile_function
     def get_game_for_analysis(self, game_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -35,8 +35,10 @@ CREATE TABLE IF NOT EXISTS profiles (
   notes      TEXT NULL
 );
 
+-- AUTOINCREMENT: position ids are never reused after a delete, so a game id
+-- reused for a new game cannot reproduce an old positions_version()
 CREATE TABLE IF NOT EXISTS positions (
-  position_id     INTEGER PRIMARY KEY,
+  position_id     INTEGER PRIMARY KEY AUTOINCREMENT,
   game_id         INTEGER NOT NULL,
   ply             INTEGER NOT NULL,
   side_to_move    TEXT NOT NULL CHECK (side_to_move IN ('W','B')),
@@ -84,6 +86,17 @@ CREATE TABLE IF NOT EXISTS moves (
 
 CREATE INDEX IF NOT EXISTS idx_moves_game_ply ON moves(game_id, ply);
 
+-- Encoded /api/analysis body per game, valid while the positions version
+-- (row count, max rowid) still matches
+CREATE TABLE IF NOT EXISTS game_analysis (
+  game_id         INTEGER PRIMARY KEY,
+  positions_count INTEGER NOT NULL,
+  positions_rowid INTEGER NOT NULL,
+  payload         BLOB NOT NULL,
+  created_utc     TEXT NOT NULL,
+  FOREIGN KEY (game_id) REFERENCES games(game_id) ON DELETE CASCADE
+);
+
 CREATE VIEW IF NOT EXISTS v_position_deltas AS
 SELECT
   position_id,
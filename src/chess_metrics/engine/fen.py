@@ -1,7 +1,8 @@
 ﻿from __future__ import annotations
-from typing import List
+from typing import Dict, List
 from .types import (
-    GameState, WHITE, BLACK,
+    GameState, Move, Undo, WHITE, BLACK,
+    PAWN, ROOK, QUEEN, KING,
     CR_WK, CR_WQ, CR_BK, CR_BQ,
     CHAR_TO_PIECE, PIECE_TO_CHAR, sq_to_alg, alg_to_sq
 )
@@ -93,3 +94,74 @@ def to_fen(state: GameState) -> str:
     ep = "-" if state.ep_sq == -1 else sq_to_alg(state.ep_sq)
 
     return f"{placement} {stm} {cr} {ep} {state.halfmove_clock} {state.fullmove_number}"
+
+# Castling right lost when a rook leaves or is captured on its home square
+_ROOK_HOME_RIGHT = {0: CR_WQ, 7: CR_WK, 56: CR_BQ, 63: CR_BK}
+
+def to_fen_incremental(prev_fen: str, move: Move, undo: Undo) -> str:
+    """
+    FEN after move, given the FEN before it and the Undo returned by
+    apply_move. Only the ranks the move touches are expanded and rewritten;
+    the rest of the placement is reused as-is. Same result as to_fen() on
+    the state after the move.
+    """
+    ranks = prev_fen.split(" ", 1)[0].split("/")  # ranks[0] is rank 8
+    side = undo.prev_side_to_move
+    moved = undo.moved_piece_before
+    kind = abs(moved)
+
+    edits: Dict[int, int] = {move.from_sq: 0, move.to_sq: side * QUEEN if move.is_promotion else moved}
+    if move.is_ep:
+        edits[undo.captured_sq] = 0
+    if move.is_castle:
+        edits[undo.rook_from] = 0
+        edits[undo.rook_to] = undo.rook_piece
+
+    for r in {sq // 8 for sq in edits}:
+        row: List[str] = []
+        for ch in ranks[7 - r]:
+            if ch.isdigit():
+                row.extend("." * int(ch))
+            else:
+                row.append(ch)
+        for sq, p in edits.items():
+            if sq // 8 == r:
+                row[sq % 8] = "." if p == 0 else PIECE_TO_CHAR[abs(p)] if p > 0 else PIECE_TO_CHAR[-p].lower()
+        # Runs of "." back to digit counts
+        ranks[7 - r] = "".join(str(len(run)) if run[0] == "." else run
+                               for run in _runs("".join(row)))
+
+    # Castling rights, as apply_move updates them
+    cr = undo.prev_castling_rights
+    if kind == KING:
+        cr &= ~(CR_WK | CR_WQ) if side == WHITE else ~(CR_BK | CR_BQ)
+    elif kind == ROOK:
+        cr &= ~_ROOK_HOME_RIGHT.get(move.from_sq, 0)
+    if abs(undo.captured_piece) == ROOK:
+        cr &= ~_ROOK_HOME_RIGHT.get(undo.captured_sq, 0)
+    cr_str = "".join(c for bit, c in ((CR_WK, "K"), (CR_WQ, "Q"), (CR_BK, "k"), (CR_BQ, "q")) if cr & bit) or "-"
+
+    ep = "-"
+    if kind == PAWN and abs(move.to_sq - move.from_sq) == 16:
+        ep = sq_to_alg((move.from_sq + move.to_sq) // 2)
+
+    halfmove = 0 if kind == PAWN or move.is_capture or move.is_ep else undo.prev_halfmove + 1
+    fullmove = undo.prev_fullmove + (1 if side == BLACK else 0)
+    stm = "b" if side == WHITE else "w"
+
+    return f"{'/'.join(ranks)} {stm} {cr_str} {ep} {halfmove} {fullmove}"
+
+def _runs(s: str) -> List[str]:
+    """Split s into runs of "." and runs of everything else."""
+    out: List[str] = []
+    start = 0
+    for i in range(1, len(s) + 1):
+        if i == len(s) or (s[i] == ".") != (s[start] == "."):
+            out.append(s[start:i])
+            start = i
+    return out
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Parsed once at import. Shared: call START_STATE.clone() before mutating.
+START_STATE = parse_fen(START_FEN)
@@ -10,7 +10,7 @@ This module provides functions to:
 from __future__ import annotations
 from typing import List, Tuple
 from .types import GameState, Move, PIECE_VALUE, piece_color, piece_kind, opposite
-from .rules import is_square_attacked, is_in_check, pseudo_attacks_square
+from .rules import is_square_attacked, is_in_check, pseudo_attacks_square, attackers_of, attacked_squares
 from .apply import apply_move, undo_move
 
 
@@ -34,19 +34,8 @@ def is_piece_defended(state: GameState, square: int, by_side: int) -> bool:
     """
     board = state.board
     
-    # Find all friendly pieces
-    for sq, piece in enumerate(board):
-        if piece == 0:
-            continue
-        if piece_color(piece) != by_side:
-            continue
-        if sq == square:
-            continue
-            
-        # Check if this piece can pseudo-attack the target square
-        if not pseudo_attacks_square(state, sq, square):
-            continue
-            
+    # Friendly pieces that pseudo-attack the square, from the attack tables
+    for sq in attackers_of(state, square, by_side):
         # Simulate the defensive move to ensure it doesn't leave king in check
         moved = board[sq]
         captured = board[square]
@@ -80,6 +69,9 @@ def evaluate_hanging_pieces(state: GameState, side: int) -> float:
     board = state.board
     opponent = opposite(side)
     hanging_value = 0.0
+
+    # Every square the opponent attacks, computed once for all our pieces
+    attacked = attacked_squares(state, opponent)
     
     # Check each of our pieces
     for sq, piece in enumerate(board):
@@ -94,7 +86,7 @@ def evaluate_hanging_pieces(state: GameState, side: int) -> float:
             continue
             
         # Check if piece is under attack
-        if is_square_attacked(state, sq, opponent):
+        if attacked >> sq & 1:
             # Check if piece is defended
             if not is_piece_defended(state, sq, side):
                 # Piece is hanging!
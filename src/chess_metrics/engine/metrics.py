@@ -12,20 +12,23 @@ from .rules import is_in_check, pseudo_attacks_square
 from .apply import apply_move, undo_move
 from .types import Move
 
-# Import profiling utilities
+# Import profiling utilities (only the original comparison path is sectioned;
+# the unified/fast modes run per search node and stay uninstrumented)
 try:
-    from chess_metrics.web.profiling import profile_function, profile_section
+    from chess_metrics.web.profiling import profile_section
 except ImportError:
     # Fallback if profiling module not available
-    def profile_function(func):
-        return func
     def profile_section(name):
         class DummyContext:
             def __enter__(self): return self
             def __exit__(self, *args): pass
         return DummyContext()
 
-@dataclass(frozen=True)
+# sqrt lookup indexed by piece value (values are small ints: 1, 3, 5, 9),
+# so DV never calls math.sqrt per defended piece
+SQRT_PV = tuple(math.sqrt(i) for i in range(16))
+
+@dataclass(frozen=True, slots=True)
 class Metrics:
     pv_w: int
     mv_w: int
@@ -101,8 +104,7 @@ def _compute_dv_optimized(state: GameState, side: int, pieces: List[Tuple[int, i
         if t_kind == KING:
             continue
 
-        value_x = PIECE_VALUE[t_kind]
-        sqrt_value = math.sqrt(value_x)
+        sqrt_value = SQRT_PV[PIECE_VALUE[t_kind]]
 
         for f_idx, (f_sq, f_kind) in enumerate(pieces):
             if f_idx == t_idx:
@@ -131,7 +133,6 @@ def _compute_dv_optimized(state: GameState, side: int, pieces: List[Tuple[int, i
     return dv
 
 
-@profile_function
 def compute_metrics_unified(state: GameState) -> Metrics:
     """
     Unified metrics computation with optimizations:
@@ -151,17 +152,15 @@ def compute_metrics_unified(state: GameState) -> Metrics:
     pv_b = _compute_pv_from_pieces(black_pieces)
 
     # Phase 3: Generate legal moves once per side, compute MV/OV
-    with profile_section("unified_mv_ov"):
-        white_moves = generate_legal_moves(state, WHITE)
-        mv_w, ov_w = _compute_mv_ov_from_moves(white_moves)
+    white_moves = generate_legal_moves(state, WHITE)
+    mv_w, ov_w = _compute_mv_ov_from_moves(white_moves)
 
-        black_moves = generate_legal_moves(state, BLACK)
-        mv_b, ov_b = _compute_mv_ov_from_moves(black_moves)
+    black_moves = generate_legal_moves(state, BLACK)
+    mv_b, ov_b = _compute_mv_ov_from_moves(black_moves)
 
     # Phase 4: Compute DV using pre-collected pieces
-    with profile_section("unified_dv"):
-        dv_w = _compute_dv_optimized(state, WHITE, white_pieces)
-        dv_b = _compute_dv_optimized(state, BLACK, black_pieces)
+    dv_w = _compute_dv_optimized(state, WHITE, white_pieces)
+    dv_b = _compute_dv_optimized(state, BLACK, black_pieces)
 
     return Metrics(pv_w, mv_w, ov_w, dv_w, pv_b, mv_b, ov_b, dv_b)
 
@@ -202,7 +201,7 @@ def _compute_dv_fast(state: GameState, side: int, pieces: List[Tuple[int, int]])
         if t_kind == KING:
             continue
 
-        sqrt_value = math.sqrt(PIECE_VALUE[t_kind])
+        sqrt_value = SQRT_PV[PIECE_VALUE[t_kind]]
 
         for f_idx, (f_sq, f_kind) in enumerate(pieces):
             if f_idx == t_idx:
@@ -214,7 +213,6 @@ def _compute_dv_fast(state: GameState, side: int, pieces: List[Tuple[int, int]])
     return dv
 
 
-@profile_function
 def compute_metrics_fast(state: GameState) -> Metrics:
     """
     Fast metrics computation using pseudo-legal moves.
@@ -250,11 +248,9 @@ def compute_metrics_fast(state: GameState) -> Metrics:
 # =============================================================================
 
 def compute_pv(state: GameState, side: int) -> int:
-    s = 0
-    for p in state.board:
-        if p != 0 and piece_color(p) == side:
-            s += PIECE_VALUE[piece_kind(p)]
-    return s
+    # One list.count per kind runs in C instead of a 64-square Python loop
+    b = state.board
+    return sum(value * b.count(side * kind) for kind, value in PIECE_VALUE.items() if value)
 
 def compute_mv_ov(state: GameState, side: int) -> Tuple[int,int]:
     legal = generate_legal_moves(state, side)
@@ -315,7 +311,7 @@ def compute_dv(state: GameState, side: int) -> float:
 
             if ok:
                 # Use square root of piece value for defense calculation
-                dv += math.sqrt(valueX)  # multiplicity counts
+                dv += SQRT_PV[valueX]  # multiplicity counts
 
     return dv
 
@@ -326,6 +322,8 @@ def compute_dv(state: GameState, side: int) -> float:
 #   "optimized" - python-chess + NumPy + Zobrist (fastest, accurate)
 #   "hybrid"    - python-chess for moves only (good balance)
 #   "unified"   - Accurate metrics with optimized single-pass (default)
+#   "numba"     - Same results as "unified" from a compiled int8-board kernel
+#                 (metrics_numba; runs uncompiled if numba is not installed)
 #   "fast"      - Fast approximation using pseudo-legal moves (~3x faster)
 #   "original"  - Original separate functions (for comparison)
 #
@@ -344,6 +342,7 @@ def compute_metrics(state: GameState) -> Metrics:
     - "optimized": python-chess + NumPy (fastest, accurate)
     - "hybrid": python-chess for moves only
     - "unified": Accurate with optimizations (default)
+    - "numba": Compiled kernel, same results as "unified"
     - "fast": Fast approximation for deep search
     - "original": Original implementation for comparison
     """
@@ -353,6 +352,9 @@ def compute_metrics(state: GameState) -> Metrics:
     elif METRICS_MODE == "hybrid":
         from .metrics_optimized import compute_metrics_hybrid
         return compute_metrics_hybrid(state)
+    elif METRICS_MODE == "numba":
+        from .metrics_numba import compute_metrics_numba
+        return compute_metrics_numba(state)
     elif METRICS_MODE == "fast":
         return compute_metrics_fast(state)
     elif METRICS_MODE == "unified":
@@ -379,10 +381,10 @@ def set_metrics_mode(mode: str) -> None:
     Set the metrics computation mode.
 
     Args:
-        mode: One of "optimized", "hybrid", "unified", "fast", or "original"
+        mode: One of "optimized", "hybrid", "unified", "numba", "fast", or "original"
     """
     global METRICS_MODE
-    valid_modes = ("optimized", "hybrid", "unified", "fast", "original")
+    valid_modes = ("optimized", "hybrid", "unified", "numba", "fast", "original")
     if mode not in valid_modes:
         raise ValueError(f"Invalid metrics mode: {mode}. Use one of {valid_modes}.")
     METRICS_MODE = mode
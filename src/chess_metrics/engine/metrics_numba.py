@@ -0,0 +1,340 @@
+"""
+Numba-compiled metrics kernel.
+
+Computes the same PV/MV/OV/DV values as compute_metrics_unified(), but works
+directly on an int8[64] board: moves are counted instead of being built as
+Move objects, and legality is checked by a temporary in-place board edit
+rather than apply_move/undo_move. The kernels only use numba-friendly
+operations (ints, floats and NumPy arrays, no dataclasses or dicts).
+
+When numba is installed the kernels are compiled with @njit(cache=True);
+otherwise they run as plain Python, which is correct but not fast.
+"""
+from __future__ import annotations
+import math
+import numpy as np
+from typing import Tuple
+from .types import GameState, WHITE, BLACK, CR_WK, CR_WQ, CR_BK, CR_BQ
+from .metrics import Metrics
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Optional dependency - kernels run uncompiled
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Index by piece kind (0-6): [0, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING]
+_PIECE_VALUES = np.array([0, 1, 3, 3, 5, 9, 0], dtype=np.int64)
+_SQRT_VALUES = np.array([math.sqrt(v) for v in (0, 1, 3, 3, 5, 9, 0)], dtype=np.float64)
+
+_KNIGHT_OFFS = np.array([17, 15, 10, 6, -6, -10, -15, -17], dtype=np.int64)
+_KING_OFFS = np.array([1, -1, 8, -8, 9, 7, -7, -9], dtype=np.int64)
+_ORTHO_OFFS = np.array([1, -1, 8, -8], dtype=np.int64)
+_DIAG_OFFS = np.array([9, 7, -7, -9], dtype=np.int64)
+
+
+@njit(cache=True)
+def _is_attacked_nb(b: np.ndarray, sq: int, by_side: int) -> bool:
+    """Mirror of rules.is_square_attacked on an int8 board."""
+    f = sq % 8
+
+    # Pawn attacks
+    if by_side == WHITE:
+        for d in (-7, -9):
+            s = sq + d
+            if 0 <= s < 64 and abs(s % 8 - f) == 1 and b[s] == 1:
+                return True
+    else:
+        for d in (7, 9):
+            s = sq + d
+            if 0 <= s < 64 and abs(s % 8 - f) == 1 and b[s] == -1:
+                return True
+
+    knight = 2 * by_side
+    king = 6 * by_side
+    for i in range(8):
+        s = sq + _KNIGHT_OFFS[i]
+        if 0 <= s < 64 and b[s] == knight:
+            df = abs(s % 8 - f)
+            if df == 1 or df == 2:
+                return True
+        s = sq + _KING_OFFS[i]
+        if 0 <= s < 64 and b[s] == king and abs(s % 8 - f) <= 1:
+            return True
+
+    # Sliding attacks (rook/queen, then bishop/queen)
+    for i in range(4):
+        d = _ORTHO_OFFS[i]
+        s = sq + d
+        while 0 <= s < 64 and (d == 8 or d == -8 or s // 8 == (s - d) // 8):
+            p = b[s]
+            if p != 0:
+                if p == 4 * by_side or p == 5 * by_side:
+                    return True
+                break
+            s += d
+    for i in range(4):
+        d = _DIAG_OFFS[i]
+        s = sq + d
+        while 0 <= s < 64 and abs(s % 8 - (s - d) % 8) == 1:
+            p = b[s]
+            if p != 0:
+                if p == 3 * by_side or p == 5 * by_side:
+                    return True
+                break
+            s += d
+
+    return False
+
+
+@njit(cache=True)
+def _king_sq_nb(b: np.ndarray, side: int) -> int:
+    king = 6 * side
+    for sq in range(64):
+        if b[sq] == king:
+            return sq
+    return -1
+
+
+@njit(cache=True)
+def _safe_after_nb(b: np.ndarray, side: int, king_sq: int,
+                   from_sq: int, to_sq: int, victim_sq: int) -> bool:
+    """
+    Play from_sq -> to_sq (removing the piece on victim_sq for en passant,
+    -1 otherwise), test whether side's king is attacked, and restore the board.
+    """
+    moved = b[from_sq]
+    captured = b[to_sq]
+    victim = 0
+    if victim_sq >= 0:
+        victim = b[victim_sq]
+        b[victim_sq] = 0
+    b[to_sq] = moved
+    b[from_sq] = 0
+
+    ksq = to_sq if from_sq == king_sq else king_sq
+    ok = ksq < 0 or not _is_attacked_nb(b, ksq, -side)
+
+    b[from_sq] = moved
+    b[to_sq] = captured
+    if victim_sq >= 0:
+        b[victim_sq] = victim
+    return ok
+
+
+@njit(cache=True)
+def _castle_ok_nb(b: np.ndarray, side: int, king_from: int, king_to: int,
+                  rook_from: int, rook_to: int) -> bool:
+    """Legality check for a castle whose path has already been admitted."""
+    king = b[king_from]
+    rook = b[rook_from]
+    b[king_from] = 0
+    b[rook_from] = 0
+    b[king_to] = king
+    b[rook_to] = rook
+    ok = not _is_attacked_nb(b, king_to, -side)
+    b[king_to] = 0
+    b[rook_to] = 0
+    b[king_from] = king
+    b[rook_from] = rook
+    return ok
+
+
+@njit(cache=True)
+def _count_move_nb(b: np.ndarray, side: int, king_sq: int,
+                   from_sq: int, to_sq: int, mv: int, ov: int) -> Tuple[int, int]:
+    """Count a non-pawn move to an empty or enemy square if it is legal."""
+    target = b[to_sq]
+    if _safe_after_nb(b, side, king_sq, from_sq, to_sq, -1):
+        if target == 0:
+            mv += 1
+        else:
+            ov += _PIECE_VALUES[abs(target)]
+    return mv, ov
+
+
+@njit(cache=True)
+def _mv_ov_nb(b: np.ndarray, side: int, castling: int, ep_sq: int) -> Tuple[int, int]:
+    """Legal-move MV/OV for side, matching movegen.generate_legal_moves."""
+    mv = 0
+    ov = 0
+    king_sq = _king_sq_nb(b, side)
+
+    for from_sq in range(64):
+        p = b[from_sq]
+        if p == 0 or (p > 0) != (side == WHITE):
+            continue
+        k = abs(p)
+        ff = from_sq % 8
+
+        if k == 1:
+            forward = 8 if side == WHITE else -8
+            start_rank = 1 if side == WHITE else 6
+            one = from_sq + forward
+            if 0 <= one < 64 and b[one] == 0:
+                if _safe_after_nb(b, side, king_sq, from_sq, one, -1):
+                    mv += 1
+                two = one + forward
+                if from_sq // 8 == start_rank and 0 <= two < 64 and b[two] == 0:
+                    if _safe_after_nb(b, side, king_sq, from_sq, two, -1):
+                        mv += 1
+            for df in (-1, 1):
+                if 0 <= ff + df <= 7:
+                    to_sq = from_sq + forward + df
+                    if 0 <= to_sq < 64:
+                        target = b[to_sq]
+                        if target != 0 and (target > 0) != (side == WHITE):
+                            if _safe_after_nb(b, side, king_sq, from_sq, to_sq, -1):
+                                ov += _PIECE_VALUES[abs(target)]
+            if ep_sq != -1:
+                ep_r = ep_sq // 8
+                r = from_sq // 8
+                if abs(ep_sq % 8 - ff) == 1 and ((side == WHITE and ep_r == r + 1) or
+                                                 (side == BLACK and ep_r == r - 1)):
+                    victim_sq = ep_sq - 8 if side == WHITE else ep_sq + 8
+                    if (0 <= victim_sq < 64 and b[victim_sq] == -side and b[ep_sq] == 0
+                            and _safe_after_nb(b, side, king_sq, from_sq, ep_sq, victim_sq)):
+                        ov += 1
+
+        elif k == 2 or k == 6:
+            offs = _KNIGHT_OFFS if k == 2 else _KING_OFFS
+            for i in range(8):
+                to_sq = from_sq + offs[i]
+                if not (0 <= to_sq < 64):
+                    continue
+                df = abs(to_sq % 8 - ff)
+                if (k == 2 and df != 1 and df != 2) or (k == 6 and df > 1):
+                    continue
+                target = b[to_sq]
+                if target == 0 or (target > 0) != (side == WHITE):
+                    mv, ov = _count_move_nb(b, side, king_sq, from_sq, to_sq, mv, ov)
+
+        else:
+            for i in range(8):
+                d = _KING_OFFS[i]
+                diagonal = i >= 4
+                if (k == 3 and not diagonal) or (k == 4 and diagonal):
+                    continue
+                to_sq = from_sq + d
+                while 0 <= to_sq < 64:
+                    if not diagonal and (d == 1 or d == -1) and to_sq // 8 != (to_sq - d) // 8:
+                        break
+                    if diagonal and abs(to_sq % 8 - (to_sq - d) % 8) != 1:
+                        break
+                    target = b[to_sq]
+                    if target != 0 and (target > 0) == (side == WHITE):
+                        break
+                    mv, ov = _count_move_nb(b, side, king_sq, from_sq, to_sq, mv, ov)
+                    if target != 0:
+                        break
+                    to_sq += d
+
+    # Castling (admission per movegen._castle_moves, then the legality check)
+    home = 0 if side == WHITE else 56
+    if b[home + 4] == 6 * side and not _is_attacked_nb(b, home + 4, -side):
+        ks_right = CR_WK if side == WHITE else CR_BK
+        qs_right = CR_WQ if side == WHITE else CR_BQ
+        if (castling & ks_right and b[home + 5] == 0 and b[home + 6] == 0
+                and b[home + 7] == 4 * side
+                and not _is_attacked_nb(b, home + 5, -side)
+                and not _is_attacked_nb(b, home + 6, -side)
+                and _castle_ok_nb(b, side, home + 4, home + 6, home + 7, home + 5)):
+            mv += 1
+        if (castling & qs_right and b[home + 3] == 0 and b[home + 2] == 0
+                and b[home + 1] == 0 and b[home] == 4 * side
+                and not _is_attacked_nb(b, home + 3, -side)
+                and not _is_attacked_nb(b, home + 2, -side)
+                and _castle_ok_nb(b, side, home + 4, home + 2, home, home + 3)):
+            mv += 1
+
+    return mv, ov
+
+
+@njit(cache=True)
+def _pseudo_attacks_nb(b: np.ndarray, from_sq: int, to_sq: int) -> bool:
+    """Mirror of rules.pseudo_attacks_square on an int8 board."""
+    p = b[from_sq]
+    k = abs(p)
+    df = to_sq % 8 - from_sq % 8
+    dr = to_sq // 8 - from_sq // 8
+
+    if k == 1:
+        return abs(df) == 1 and dr == (1 if p > 0 else -1)
+    if k == 2:
+        return (abs(df) == 1 and abs(dr) == 2) or (abs(df) == 2 and abs(dr) == 1)
+    if k == 6:
+        return max(abs(df), abs(dr)) == 1
+
+    if df == 0 and dr != 0:
+        if k == 3:
+            return False
+        step = 8 if dr > 0 else -8
+    elif dr == 0 and df != 0:
+        if k == 3:
+            return False
+        step = 1 if df > 0 else -1
+    elif abs(df) == abs(dr) and df != 0:
+        if k == 4:
+            return False
+        step = (9 if df > 0 else 7) if dr > 0 else (-7 if df > 0 else -9)
+    else:
+        return False
+
+    # Aligned on a ray, so the path cannot wrap: only blockers matter
+    s = from_sq + step
+    while s != to_sq:
+        if b[s] != 0:
+            return False
+        s += step
+    return True
+
+
+@njit(cache=True)
+def _dv_nb(b: np.ndarray, side: int) -> float:
+    """DV for side, matching metrics._compute_dv_optimized."""
+    king_sq = _king_sq_nb(b, side)
+    dv = 0.0
+    for t_sq in range(64):
+        t = b[t_sq]
+        if t == 0 or (t > 0) != (side == WHITE) or abs(t) == 6:
+            continue
+        sqrt_value = _SQRT_VALUES[abs(t)]
+        for f_sq in range(64):
+            f = b[f_sq]
+            if f_sq == t_sq or f == 0 or (f > 0) != (side == WHITE):
+                continue
+            if _pseudo_attacks_nb(b, f_sq, t_sq) and _safe_after_nb(b, side, king_sq, f_sq, t_sq, -1):
+                dv += sqrt_value
+    return dv
+
+
+@njit(cache=True)
+def _compute_metrics_nb(b: np.ndarray, side: int, castling: int,
+                        ep_sq: int) -> Tuple[float, float, float, float]:
+    """(PV, MV, OV, DV) for one side of an int8[64] board."""
+    pv = 0
+    for sq in range(64):
+        p = b[sq]
+        if p != 0 and (p > 0) == (side == WHITE):
+            pv += _PIECE_VALUES[abs(p)]
+    mv, ov = _mv_ov_nb(b, side, castling, ep_sq)
+    return float(pv), float(mv), float(ov), _dv_nb(b, side)
+
+
+def compute_metrics_numba(state: GameState) -> Metrics:
+    """
+    Compute all metrics with the compiled kernel.
+
+    Returns the same Metrics as compute_metrics_unified().
+    """
+    board = np.array(state.board, dtype=np.int8)
+    pv_w, mv_w, ov_w, dv_w = _compute_metrics_nb(board, WHITE, state.castling_rights, state.ep_sq)
+    pv_b, mv_b, ov_b, dv_b = _compute_metrics_nb(board, BLACK, state.castling_rights, state.ep_sq)
+    return Metrics(int(pv_w), int(mv_w), int(ov_w), float(dv_w),
+                   int(pv_b), int(mv_b), int(ov_b), float(dv_b))
@@ -7,7 +7,7 @@ from .types import (
     CR_WK, CR_WQ, CR_BK, CR_BQ,
     piece_color, piece_kind, opposite
 )
-from .rules import is_in_check, is_square_attacked, file_of, rank_of
+from .rules import is_in_check, is_square_attacked, file_of, rank_of, find_king_sq, KING_TARGETS
 from .apply import apply_move, undo_move
 
 def on_board(sq: int) -> bool:
@@ -16,7 +16,23 @@ def on_board(sq: int) -> bool:
 def same_rank(a: int, b: int) -> bool:
     return (a // 8) == (b // 8)
 
-def gen_pseudo_moves(state: GameState, side: int) -> List[Move]:
+# kind_mask bit for each piece kind is 1 << kind (e.g. 1 << KING); all set by default
+ALL_KINDS = 0xFF
+
+# Upper bound on legal moves in any position (218 is the known maximum);
+# size for buffers passed to generate_legal_moves_into
+MAX_MOVES = 256
+
+def gen_pseudo_moves(state: GameState, side: int, kind_mask: int = ALL_KINDS) -> List[Move]:
+    moves = _piece_moves(state, side, kind_mask)
+
+    # Castling pseudo (with legality admission per spec)
+    if kind_mask & (1 << KING):
+        moves.extend(_castle_moves(state, side))
+
+    return moves
+
+def _piece_moves(state: GameState, side: int, kind_mask: int = ALL_KINDS) -> List[Move]:
     b = state.board
     moves: List[Move] = []
 
@@ -24,6 +40,8 @@ def gen_pseudo_moves(state: GameState, side: int) -> List[Move]:
         if p == 0 or piece_color(p) != side:
             continue
         k = piece_kind(p)
+        if not (kind_mask >> k) & 1:
+            continue
 
         if k == PAWN:
             moves.extend(_pawn_moves(state, side, from_sq))
@@ -38,13 +56,15 @@ def gen_pseudo_moves(state: GameState, side: int) -> List[Move]:
         elif k == KING:
             moves.extend(_king_moves(state, side, from_sq))
 
-    # Castling pseudo (with legality admission per spec)
-    moves.extend(_castle_moves(state, side))
-
     return moves
 
-def generate_legal_moves(state: GameState, side: int) -> List[Move]:
-    pseudo = gen_pseudo_moves(state, side)
+def generate_legal_moves(state: GameState, side: int, kind_mask: int = ALL_KINDS) -> List[Move]:
+    """
+    Legal moves for side in UCI order. kind_mask restricts generation to the
+    piece kinds whose bit (1 << kind) is set; other pieces are skipped before
+    any Move is built or checked for legality.
+    """
+    pseudo = gen_pseudo_moves(state, side, kind_mask)
     legal: List[Move] = []
     for m in pseudo:
         u = apply_move(state, m)
@@ -52,7 +72,58 @@ def generate_legal_moves(state: GameState, side: int) -> List[Move]:
             legal.append(m)
         undo_move(state, u)
     # stable deterministic order (UCI)
-    legal.sort(key=lambda m: m.uci())
+    legal.sort(key=Move.uci_order)
+    return legal
+
+def generate_king_moves(state: GameState, side: int) -> List[Move]:
+    """
+    Legal king moves for side (castling included) in UCI order; the same list
+    as generate_legal_moves(state, side, kind_mask=1 << KING), but built from
+    the king square instead of a scan of the whole board.
+    """
+    pseudo = _king_moves(state, side, find_king_sq(state, side))
+    pseudo.extend(_castle_moves(state, side))
+    legal: List[Move] = []
+    for m in pseudo:
+        u = apply_move(state, m)
+        if not is_in_check(state, side):
+            legal.append(m)
+        undo_move(state, u)
+    legal.sort(key=Move.uci_order)
+    return legal
+
+def generate_legal_moves_into(state: GameState, side: int, out: List[Move], start: int = 0) -> int:
+    """
+    Write the legal moves for side into out[start:] and return how many were
+    written. out must already have room (see MAX_MOVES); nothing is appended.
+    Moves are left in generation order, not UCI order, which is all counting
+    callers such as perft need. Lets a caller reuse one buffer per ply.
+    """
+    n = start
+    for m in gen_pseudo_moves(state, side):
+        u = apply_move(state, m)
+        if not is_in_check(state, side):
+            out[n] = m
+            n += 1
+        undo_move(state, u)
+    return n - start
+
+def generate_legal_captures(state: GameState, side: int) -> List[Move]:
+    """
+    Legal captures only (including en passant), in the same UCI order as
+    generate_legal_moves. Quiet moves are dropped before the legality check
+    and castling is never generated, so quiescence search skips most of the
+    apply/undo work.
+    """
+    legal: List[Move] = []
+    for m in _piece_moves(state, side):
+        if not m.is_capture:
+            continue
+        u = apply_move(state, m)
+        if not is_in_check(state, side):
+            legal.append(m)
+        undo_move(state, u)
+    legal.sort(key=Move.uci_order)
     return legal
 
 def _pawn_moves(state: GameState, side: int, from_sq: int) -> List[Move]:
@@ -126,13 +197,7 @@ def _knight_moves(state: GameState, side: int, from_sq: int) -> List[Move]:
 def _king_moves(state: GameState, side: int, from_sq: int) -> List[Move]:
     b = state.board
     moves: List[Move] = []
-    ff = file_of(from_sq)
-    for d in (+1,-1,+8,-8,+9,+7,-7,-9):
-        to = from_sq + d
-        if not on_board(to):
-            continue
-        if abs(file_of(to) - ff) > 1:
-            continue
+    for to in KING_TARGETS[from_sq]:
         target = b[to]
         if target == 0:
             moves.append(Move(from_sq, to, KING))
@@ -102,6 +102,17 @@ def count_pieces_numpy(board_array: np.ndarray) -> Tuple[int, int]:
     return white_count, black_count
 
 
+def count_kinds_numpy(board: List[int] | np.ndarray) -> np.ndarray:
+    """
+    Count pieces of each kind (both colors) in one bincount pass.
+    
+    Returns:
+        Array of length 7 indexed by piece kind; index 0 counts empty squares
+    """
+    board_array = np.asarray(board, dtype=np.int8)
+    return np.bincount(np.abs(board_array), minlength=7)
+
+
 def find_king_numpy(board_array: np.ndarray, side: int) -> int:
     """
     Find king square using NumPy.
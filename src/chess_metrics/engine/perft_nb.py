@@ -0,0 +1,212 @@
+"""
+Numba-compiled perft.
+
+Counts leaf nodes exactly like a perft over generate_legal_moves/apply_move,
+but on an int8[64] board with moves packed into int32 codes (from_sq,
+to_sq << 6, FLAG_* << 12) in one preallocated buffer per ply. Promotions are
+to a queen only, matching movegen. Legality checks reuse the board kernels
+from metrics_numba.
+
+When numba is installed the kernels are compiled with @njit(cache=True);
+otherwise they run as plain Python, which is correct but not fast.
+"""
+from __future__ import annotations
+import numpy as np
+from .types import (
+    GameState, WHITE, QUEEN, CR_WK, CR_WQ, CR_BK, CR_BQ,
+    FLAG_EP, FLAG_CASTLE, FLAG_PROMOTION
+)
+from .movegen import MAX_MOVES
+from .metrics_numba import (
+    njit, _KNIGHT_OFFS, _KING_OFFS,
+    _is_attacked_nb, _king_sq_nb, _safe_after_nb, _castle_ok_nb
+)
+
+# Castling rights kept when a move touches a square (from or to): moving the
+# king or a rook, or capturing on a rook's home square, clears that right
+_CASTLE_KEEP = np.full(64, CR_WK | CR_WQ | CR_BK | CR_BQ, dtype=np.int64)
+_CASTLE_KEEP[0] &= ~CR_WQ
+_CASTLE_KEEP[7] &= ~CR_WK
+_CASTLE_KEEP[4] &= ~(CR_WK | CR_WQ)
+_CASTLE_KEEP[56] &= ~CR_BQ
+_CASTLE_KEEP[63] &= ~CR_BK
+_CASTLE_KEEP[60] &= ~(CR_BK | CR_BQ)
+
+
+@njit(cache=True)
+def _legal_moves_nb(b: np.ndarray, side: int, castling: int, ep_sq: int, out: np.ndarray) -> int:
+    """Write side's legal moves into out as packed codes and return the count."""
+    n = 0
+    king_sq = _king_sq_nb(b, side)
+
+    for from_sq in range(64):
+        p = b[from_sq]
+        if p == 0 or (p > 0) != (side == WHITE):
+            continue
+        k = abs(p)
+        ff = from_sq % 8
+
+        if k == 1:
+            forward = 8 if side == WHITE else -8
+            start_rank = 1 if side == WHITE else 6
+            promo_rank = 7 if side == WHITE else 0
+            one = from_sq + forward
+            if 0 <= one < 64 and b[one] == 0:
+                if _safe_after_nb(b, side, king_sq, from_sq, one, -1):
+                    flags = FLAG_PROMOTION if one // 8 == promo_rank else 0
+                    out[n] = from_sq | (one << 6) | (flags << 12)
+                    n += 1
+                two = one + forward
+                if from_sq // 8 == start_rank and 0 <= two < 64 and b[two] == 0:
+                    if _safe_after_nb(b, side, king_sq, from_sq, two, -1):
+                        out[n] = from_sq | (two << 6)
+                        n += 1
+            for df in (-1, 1):
+                if 0 <= ff + df <= 7:
+                    to_sq = from_sq + forward + df
+                    if 0 <= to_sq < 64:
+                        target = b[to_sq]
+                        if target != 0 and (target > 0) != (side == WHITE):
+                            if _safe_after_nb(b, side, king_sq, from_sq, to_sq, -1):
+                                flags = FLAG_PROMOTION if to_sq // 8 == promo_rank else 0
+                                out[n] = from_sq | (to_sq << 6) | (flags << 12)
+                                n += 1
+            if ep_sq != -1:
+                ep_r = ep_sq // 8
+                r = from_sq // 8
+                if abs(ep_sq % 8 - ff) == 1 and ep_r == r + (1 if side == WHITE else -1):
+                    victim_sq = ep_sq - 8 if side == WHITE else ep_sq + 8
+                    if (0 <= victim_sq < 64 and b[victim_sq] == -side and b[ep_sq] == 0
+                            and _safe_after_nb(b, side, king_sq, from_sq, ep_sq, victim_sq)):
+                        out[n] = from_sq | (ep_sq << 6) | (FLAG_EP << 12)
+                        n += 1
+
+        elif k == 2 or k == 6:
+            offs = _KNIGHT_OFFS if k == 2 else _KING_OFFS
+            for i in range(8):
+                to_sq = from_sq + offs[i]
+                if not (0 <= to_sq < 64):
+                    continue
+                df = abs(to_sq % 8 - ff)
+                if (k == 2 and df != 1 and df != 2) or (k == 6 and df > 1):
+                    continue
+                target = b[to_sq]
+                if target == 0 or (target > 0) != (side == WHITE):
+                    if _safe_after_nb(b, side, king_sq, from_sq, to_sq, -1):
+                        out[n] = from_sq | (to_sq << 6)
+                        n += 1
+
+        else:
+            for i in range(8):
+                d = _KING_OFFS[i]
+                diagonal = i >= 4
+                if (k == 3 and not diagonal) or (k == 4 and diagonal):
+                    continue
+                to_sq = from_sq + d
+                while 0 <= to_sq < 64:
+                    if not diagonal and (d == 1 or d == -1) and to_sq // 8 != (to_sq - d) // 8:
+                        break
+                    if diagonal and abs(to_sq % 8 - (to_sq - d) % 8) != 1:
+                        break
+                    target = b[to_sq]
+                    if target != 0 and (target > 0) == (side == WHITE):
+                        break
+                    if _safe_after_nb(b, side, king_sq, from_sq, to_sq, -1):
+                        out[n] = from_sq | (to_sq << 6)
+                        n += 1
+                    if target != 0:
+                        break
+                    to_sq += d
+
+    # Castling (admission per movegen._castle_moves, then the legality check)
+    home = 0 if side == WHITE else 56
+    if b[home + 4] == 6 * side and not _is_attacked_nb(b, home + 4, -side):
+        ks_right = CR_WK if side == WHITE else CR_BK
+        qs_right = CR_WQ if side == WHITE else CR_BQ
+        if (castling & ks_right and b[home + 5] == 0 and b[home + 6] == 0
+                and b[home + 7] == 4 * side
+                and not _is_attacked_nb(b, home + 5, -side)
+                and not _is_attacked_nb(b, home + 6, -side)
+                and _castle_ok_nb(b, side, home + 4, home + 6, home + 7, home + 5)):
+            out[n] = (home + 4) | ((home + 6) << 6) | (FLAG_CASTLE << 12)
+            n += 1
+        if (castling & qs_right and b[home + 3] == 0 and b[home + 2] == 0
+                and b[home + 1] == 0 and b[home] == 4 * side
+                and not _is_attacked_nb(b, home + 3, -side)
+                and not _is_attacked_nb(b, home + 2, -side)
+                and _castle_ok_nb(b, side, home + 4, home + 2, home, home + 3)):
+            out[n] = (home + 4) | ((home + 2) << 6) | (FLAG_CASTLE << 12)
+            n += 1
+
+    return n
+
+
+@njit(cache=True)
+def _perft_nb(b: np.ndarray, side: int, castling: int, ep_sq: int,
+              depth: int, moves: np.ndarray) -> int:
+    """Recursive perft for depth >= 1; moves[depth] is this ply's buffer."""
+    buf = moves[depth]
+    n = _legal_moves_nb(b, side, castling, ep_sq, buf)
+    if depth == 1:
+        return n
+
+    total = 0
+    for i in range(n):
+        code = buf[i]
+        from_sq = code & 63
+        to_sq = (code >> 6) & 63
+        flags = code >> 12
+
+        moved = b[from_sq]
+        captured = b[to_sq]
+        victim_sq = -1
+        victim = 0
+        if flags & FLAG_EP:
+            victim_sq = to_sq - 8 * side
+            victim = b[victim_sq]
+            b[victim_sq] = 0
+        b[to_sq] = QUEEN * side if flags & FLAG_PROMOTION else moved
+        b[from_sq] = 0
+        rook_from = -1
+        rook_to = -1
+        if flags & FLAG_CASTLE:
+            if to_sq > from_sq:
+                rook_from, rook_to = from_sq + 3, from_sq + 1
+            else:
+                rook_from, rook_to = from_sq - 4, from_sq - 1
+            b[rook_to] = b[rook_from]
+            b[rook_from] = 0
+
+        new_ep = -1
+        if abs(moved) == 1 and abs(to_sq - from_sq) == 16:
+            new_ep = (from_sq + to_sq) // 2
+        new_castling = castling & _CASTLE_KEEP[from_sq] & _CASTLE_KEEP[to_sq]
+
+        total += _perft_nb(b, -side, new_castling, new_ep, depth - 1, moves)
+
+        if rook_from >= 0:
+            b[rook_from] = b[rook_to]
+            b[rook_to] = 0
+        b[from_sq] = moved
+        b[to_sq] = captured
+        if victim_sq >= 0:
+            b[victim_sq] = victim
+
+    return total
+
+
+def perft_nb(board: np.ndarray, side: int, castling: int, ep_sq: int, depth: int) -> int:
+    """
+    Leaf-node count to depth for an int8[64] board. The board is modified
+    during the search and restored before returning.
+    """
+    if depth == 0:
+        return 1
+    moves = np.empty((depth + 1, MAX_MOVES), dtype=np.int32)
+    return int(_perft_nb(board, side, castling, ep_sq, depth, moves))
+
+
+def perft_numba(state: GameState, depth: int) -> int:
+    """perft_nb() for a GameState; state is not modified."""
+    board = np.array(state.board, dtype=np.int8)
+    return perft_nb(board, state.side_to_move, state.castling_rights, state.ep_sq, depth)
@@ -1,4 +1,5 @@
 ﻿from __future__ import annotations
+from typing import List, Tuple
 from .types import (
     WHITE, BLACK,
     PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING,
@@ -23,68 +24,121 @@ def file_of(sq: int) -> int:
 def rank_of(sq: int) -> int:
     return sq // 8
 
+# Precomputed per-square attack tables. Off-board and wrapped targets are
+# dropped here once, so the scans below are plain tuple walks.
+def _leaper_targets(sq: int, offs: List[int], max_df: int) -> Tuple[int, ...]:
+    return tuple(sq + d for d in offs
+                 if 0 <= sq + d < 64 and abs(file_of(sq + d) - file_of(sq)) <= max_df)
+
+def _ray(sq: int, d: int) -> Tuple[int, ...]:
+    out = []
+    s = sq + d
+    while 0 <= s < 64 and abs(file_of(s) - file_of(s - d)) <= 1:
+        out.append(s)
+        s += d
+    return tuple(out)
+
+KNIGHT_TARGETS = tuple(_leaper_targets(sq, KNIGHT_OFFS, 2) for sq in range(64))
+KING_TARGETS = tuple(_leaper_targets(sq, KING_OFFS, 1) for sq in range(64))
+# Squares a pawn of the given side would attack sq from
+PAWN_ATTACKER_SQS = {
+    WHITE: tuple(_leaper_targets(sq, [-7, -9], 1) for sq in range(64)),
+    BLACK: tuple(_leaper_targets(sq, [+7, +9], 1) for sq in range(64)),
+}
+# Non-empty rays only, nearest square first
+ORTHO_RAYS = tuple(tuple(r for r in (_ray(sq, d) for d in (+1, -1, +8, -8)) if r) for sq in range(64))
+DIAG_RAYS = tuple(tuple(r for r in (_ray(sq, d) for d in (+9, +7, -7, -9)) if r) for sq in range(64))
+
 def is_square_attacked(state, sq: int, by_side: int) -> bool:
     b = state.board
 
-    # Pawn attacks
-    if by_side == WHITE:
-        for d in (-7, -9):
-            s = sq + d
-            if 0 <= s < 64:
-                # ensure file delta matches diagonal
-                if abs(file_of(s) - file_of(sq)) == 1 and b[s] == WHITE * PAWN:
-                    return True
-    else:
-        for d in (+7, +9):
-            s = sq + d
-            if 0 <= s < 64:
-                if abs(file_of(s) - file_of(sq)) == 1 and b[s] == BLACK * PAWN:
-                    return True
-
-    # Knight attacks
-    for d in KNIGHT_OFFS:
-        s = sq + d
-        if 0 <= s < 64 and abs(file_of(s) - file_of(sq)) in (1,2):
-            p = b[s]
-            if p != 0 and piece_color(p) == by_side and piece_kind(p) == KNIGHT:
-                return True
-
-    # King attacks
-    for d in KING_OFFS:
-        s = sq + d
-        if 0 <= s < 64 and abs(file_of(s) - file_of(sq)) <= 1:
-            p = b[s]
-            if p != 0 and piece_color(p) == by_side and piece_kind(p) == KING:
-                return True
-
-    # Sliding attacks (rook/queen)
-    for d in (+1, -1, +8, -8):
-        s = sq + d
-        while 0 <= s < 64 and (d in (+8,-8) or same_rank(s, s-d)):
+    pawn = by_side * PAWN
+    for s in PAWN_ATTACKER_SQS[by_side][sq]:
+        if b[s] == pawn:
+            return True
+
+    knight = by_side * KNIGHT
+    for s in KNIGHT_TARGETS[sq]:
+        if b[s] == knight:
+            return True
+
+    king = by_side * KING
+    for s in KING_TARGETS[sq]:
+        if b[s] == king:
+            return True
+
+    # Sliding attacks: only the first piece on each ray matters
+    rook, queen = by_side * ROOK, by_side * QUEEN
+    for ray in ORTHO_RAYS[sq]:
+        for s in ray:
             p = b[s]
             if p != 0:
-                if piece_color(p) == by_side:
-                    k = piece_kind(p)
-                    if k == ROOK or k == QUEEN:
-                        return True
+                if p == rook or p == queen:
+                    return True
                 break
-            s += d
 
-    # Sliding attacks (bishop/queen)
-    for d in (+9, +7, -7, -9):
-        s = sq + d
-        while 0 <= s < 64 and abs(file_of(s) - file_of(s-d)) == 1:
+    bishop = by_side * BISHOP
+    for ray in DIAG_RAYS[sq]:
+        for s in ray:
             p = b[s]
             if p != 0:
-                if piece_color(p) == by_side:
-                    k = piece_kind(p)
-                    if k == BISHOP or k == QUEEN:
-                        return True
+                if p == bishop or p == queen:
+                    return True
                 break
-            s += d
 
     return False
 
+def attacked_squares(state, by_side: int) -> int:
+    """
+    Bitmask (bit sq set) of every square by_side attacks, from one pass over
+    its pieces. Bit sq matches is_square_attacked(state, sq, by_side).
+    """
+    b = state.board
+    # A pawn of by_side on s attacks the squares an enemy pawn would be
+    # attacked from, i.e. the other side's attacker table read at s
+    pawn_targets = PAWN_ATTACKER_SQS[opposite(by_side)]
+    mask = 0
+    for s, p in enumerate(b):
+        if p == 0 or piece_color(p) != by_side:
+            continue
+        k = piece_kind(p)
+        if k == PAWN:
+            targets = pawn_targets[s]
+        elif k == KNIGHT:
+            targets = KNIGHT_TARGETS[s]
+        elif k == KING:
+            targets = KING_TARGETS[s]
+        else:
+            rays = DIAG_RAYS[s] if k == BISHOP else ORTHO_RAYS[s] if k == ROOK else ORTHO_RAYS[s] + DIAG_RAYS[s]
+            for ray in rays:
+                for t in ray:
+                    mask |= 1 << t
+                    if b[t] != 0:
+                        break
+            continue
+        for t in targets:
+            mask |= 1 << t
+    return mask
+
+def attackers_of(state, sq: int, by_side: int) -> List[int]:
+    """
+    Squares of by_side's pieces that pseudo-attack sq (same answer as
+    pseudo_attacks_square over every square, from the attack tables).
+    """
+    b = state.board
+    out = [s for s in PAWN_ATTACKER_SQS[by_side][sq] if b[s] == by_side * PAWN]
+    out += [s for s in KNIGHT_TARGETS[sq] if b[s] == by_side * KNIGHT]
+    out += [s for s in KING_TARGETS[sq] if b[s] == by_side * KING]
+    for rays, kinds in ((ORTHO_RAYS[sq], (ROOK, QUEEN)), (DIAG_RAYS[sq], (BISHOP, QUEEN))):
+        for ray in rays:
+            for s in ray:
+                p = b[s]
+                if p != 0:
+                    if piece_color(p) == by_side and piece_kind(p) in kinds:
+                        out.append(s)
+                    break
+    return out
+
 def find_king_sq(state, side: int) -> int:
     target = side * KING
     for sq, p in enumerate(state.board):
@@ -1,57 +1,84 @@
 ﻿from __future__ import annotations
+import atexit
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Tuple, Dict
-from functools import lru_cache
-from .types import GameState, Move, WHITE, BLACK, opposite
-from .movegen import generate_legal_moves
-from .metrics import compute_metrics, compute_metrics_fast, deltas, Metrics
+from typing import Optional, Tuple, Dict, List
+from .types import GameState, Move, WHITE, opposite, move_key
+from .movegen import generate_legal_moves, generate_legal_captures
+from .metrics import compute_metrics, deltas, Metrics
 from .rules import is_in_check
 from .apply import apply_move, undo_move
 from .fen import to_fen, parse_fen
-from .zobrist import zobrist_hash
+from .zobrist import zobrist_hash, hash_after_move, ZOBRIST_SIDE_TOGGLE
 from .material_safety import evaluate_material_safety, has_adequate_compensation
 
-# Import profiling utilities
+# Import profiling utilities.
+# Only the choose_best_move entry point is profiled: per-node sections and
+# decorators inside the search cost more than the work they were timing.
 try:
-    from chess_metrics.web.profiling import profile_function, profile_section
+    from chess_metrics.web.profiling import profile_function
 except ImportError:
     # Fallback if profiling module not available
     def profile_function(func):
         return func
-    def profile_section(name):
-        class DummyContext:
-            def __enter__(self): return self
-            def __exit__(self, *args): pass
-        return DummyContext()
 
 MATE = 10**9
 
-# Transposition table entry with bound types and best move
-@dataclass
+# Material safety is CRITICAL - weight it heavily.
+# A safety score of -9 (hanging queen) should override most positional gains.
+DEFAULT_SAFETY_WEIGHT = 10.0
+SAFETY_WEIGHTS = {
+    "materialist": 15.0,    # extra cautious about material
+    "offense-first": 7.0,   # can take calculated risks, but not sacrifice the queen for nothing
+    "defense-first": 12.0,  # very cautious
+}
+
+# Transposition table bound flags
+TT_EXACT = 0  # score is the exact minimax value
+TT_LOWER = 1  # true value >= score (search failed high)
+TT_UPPER = 2  # true value <= score (search failed low)
+
+# Transposition table entry with bound types and best move.
+# leaf_metrics is a reference to the Metrics object the search already holds
+# (shared with the metrics cache), not a copy; root tie-breaking reads it.
+@dataclass(frozen=True, slots=True)
 class TTEntry:
     score: float
     depth: int
-    bound_type: str  # 'exact', 'lower', 'upper'
-    best_move: Optional[Tuple[int, int]]  # (from_sq, to_sq)
+    bound_type: int  # TT_EXACT, TT_LOWER or TT_UPPER
+    best_move: Optional[int]  # packed from/to key (types.move_key)
     leaf_metrics: Metrics
 
 # Global transposition table (now using Zobrist hash keys with improved entries)
 _transposition_table: Dict[int, TTEntry] = {}
 MAX_TT_SIZE = 1_000_000  # Limit cache size to prevent memory issues
 
-# Metrics cache using Zobrist hashing
-_metrics_cache: Dict[int, Metrics] = {}
+# Metrics cache using Zobrist hashing, bounded LRU so long sessions don't grow without limit
+_metrics_cache: "OrderedDict[int, Metrics]" = OrderedDict()
+MAX_METRICS_CACHE_SIZE = 1 << 18
 
 # Killer moves: store 2 killer moves per ply (depth level)
 # Killer moves are non-capture moves that caused beta cutoffs
-_killer_moves: Dict[int, list[Tuple[int, int]]] = {}  # ply -> [(from_sq, to_sq), ...]
+_killer_moves: Dict[int, list[int]] = {}  # ply -> [move_key, ...]
 MAX_KILLERS_PER_PLY = 2
 
 # History heuristic: track moves that cause cutoffs across the entire search tree
-# Maps (from_sq, to_sq) -> score. Higher score = move caused more cutoffs
-_history_scores: Dict[Tuple[int, int], int] = {}
+# Maps move_key(from_sq, to_sq) -> score. Higher score = move caused more cutoffs
+_history_scores: Dict[int, int] = {}
 
-@dataclass(frozen=True)
+# Root splitting: root moves are independent subtrees, so they can be searched
+# in worker processes (each worker owns its own transposition table).
+# Below PARALLEL_MIN_ROOT_MOVES the pool overhead outweighs the gain.
+PARALLEL_MIN_ROOT_MOVES = 4
+_root_pool: Optional[ProcessPoolExecutor] = None
+
+# Bumped by clear_transposition_table() so workers know to drop their tables
+_tt_generation = 0
+_worker_tt_generation = 0
+
+@dataclass(frozen=True, slots=True)
 class Profile:
     name: str
     wPV: float = 1.0
@@ -59,21 +86,22 @@ class Profile:
     wOV: float = 1.0
     wDV: float = 1.0
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SearchResult:
     scoreS: float
     leaf_metrics: Metrics
 
 def clear_transposition_table():
     """Clear the transposition table between games."""
-    global _transposition_table, _metrics_cache, _killer_moves, _history_scores
+    global _transposition_table, _metrics_cache, _killer_moves, _history_scores, _tt_generation
     _transposition_table.clear()
     _metrics_cache.clear()
     _killer_moves.clear()
     _history_scores.clear()
+    _tt_generation += 1
 
-def store_tt(hash_key: int, score: float, depth: int, bound_type: str,
-             best_move: Optional[Tuple[int, int]], metrics: Metrics):
+def store_tt(hash_key: int, score: float, depth: int, bound_type: int,
+             best_move: Optional[int], leaf_metrics: Metrics):
     """
     Store position in transposition table with depth-preferred replacement.
 
@@ -81,9 +109,9 @@ def store_tt(hash_key: int, score: float, depth: int, bound_type: str,
         hash_key: Zobrist hash of the position
         score: Evaluation score
         depth: Search depth
-        bound_type: 'exact', 'lower', or 'upper'
-        best_move: Best move found (from_sq, to_sq)
-        metrics: Leaf metrics
+        bound_type: TT_EXACT, TT_LOWER or TT_UPPER
+        best_move: Best move found, as move_key(from_sq, to_sq)
+        leaf_metrics: Metrics of the leaf the score came from
     """
     global _transposition_table
 
@@ -98,12 +126,15 @@ def store_tt(hash_key: int, score: float, depth: int, bound_type: str,
         # Simple replacement: remove first entry (could be improved with LRU)
         _transposition_table.pop(next(iter(_transposition_table)))
 
-    _transposition_table[hash_key] = TTEntry(score, depth, bound_type, best_move, metrics)
+    _transposition_table[hash_key] = TTEntry(score, depth, bound_type, best_move, leaf_metrics)
 
-def probe_tt(hash_key: int, depth: int, alpha: float, beta: float) -> Optional[SearchResult]:
+def probe_tt(hash_key: int, depth: int, alpha: float, beta: float) -> Tuple[Optional[SearchResult], float, float]:
     """
     Probe transposition table with bound checking.
 
+    Bound entries tighten the window even when they cannot end the search:
+    a lower bound raises alpha, an upper bound lowers beta.
+
     Args:
         hash_key: Zobrist hash of the position
         depth: Current search depth
@@ -111,34 +142,43 @@ def probe_tt(hash_key: int, depth: int, alpha: float, beta: float) -> Optional[S
         beta: Beta bound
 
     Returns:
-        SearchResult if we can use the cached value, None otherwise
+        (result, alpha, beta) - result is the cached SearchResult if it decides
+        this node (None otherwise); alpha/beta are the possibly tightened bounds
     """
-    if hash_key not in _transposition_table:
-        return None
-
-    entry = _transposition_table[hash_key]
+    entry = _transposition_table.get(hash_key)
+    if entry is None:
+        return None, alpha, beta
 
     # Only use entries from searches at least as deep as current
     if entry.depth < depth:
-        return None
+        return None, alpha, beta
+
+    flag = entry.bound_type
+    if flag == TT_EXACT:
+        return SearchResult(entry.score, entry.leaf_metrics), alpha, beta
+    if flag == TT_LOWER:
+        alpha = max(alpha, entry.score)
+    else:
+        beta = min(beta, entry.score)
 
-    # Check if we can use this entry based on bound type
-    if entry.bound_type == 'exact':
-        return SearchResult(entry.score, entry.leaf_metrics)
-    elif entry.bound_type == 'lower' and entry.score >= beta:
-        return SearchResult(entry.score, entry.leaf_metrics)
-    elif entry.bound_type == 'upper' and entry.score <= alpha:
-        return SearchResult(entry.score, entry.leaf_metrics)
+    if alpha >= beta:
+        return SearchResult(entry.score, entry.leaf_metrics), alpha, beta
+    return None, alpha, beta
 
-    return None
+def _bound_flag(score: float, alpha_orig: float, beta_orig: float) -> int:
+    """Classify a search result against the window it was searched with."""
+    if score <= alpha_orig:
+        return TT_UPPER
+    if score >= beta_orig:
+        return TT_LOWER
+    return TT_EXACT
 
-def get_pv_move(hash_key: int) -> Optional[Tuple[int, int]]:
+def get_pv_move(hash_key: int) -> Optional[int]:
     """Get the principal variation (best) move from transposition table."""
     if hash_key in _transposition_table:
         return _transposition_table[hash_key].best_move
     return None
 
-@profile_function
 def cached_compute_metrics(hash_key: int, state: GameState) -> Metrics:
     """
     Cache metrics computation using Zobrist hash.
@@ -152,9 +192,16 @@ def cached_compute_metrics(hash_key: int, state: GameState) -> Metrics:
         hash_key: Zobrist hash of the position
         state: Game state
     """
-    if hash_key not in _metrics_cache:
-        _metrics_cache[hash_key] = compute_metrics(state)
-    return _metrics_cache[hash_key]
+    m = _metrics_cache.get(hash_key)
+    if m is not None:
+        _metrics_cache.move_to_end(hash_key)
+        return m
+
+    m = compute_metrics(state)
+    _metrics_cache[hash_key] = m
+    if len(_metrics_cache) > MAX_METRICS_CACHE_SIZE:
+        _metrics_cache.popitem(last=False)
+    return m
 
 def score(metrics: Metrics, profile: Profile) -> float:
     dPV, dMV, dOV, dDV = deltas(metrics)
@@ -164,6 +211,10 @@ def score_s(metrics: Metrics, profile: Profile, root_side: int) -> float:
     s = score(metrics, profile)
     return s if root_side == WHITE else -s
 
+def safety_weight(profile: Profile) -> float:
+    """Multiplier applied to material safety scores for this profile."""
+    return SAFETY_WEIGHTS.get(profile.name, DEFAULT_SAFETY_WEIGHT)
+
 def evaluate_move_with_safety(state: GameState, move: Move, metrics: Metrics,
                                profile: Profile, root_side: int) -> float:
     """
@@ -190,24 +241,8 @@ def evaluate_move_with_safety(state: GameState, move: Move, metrics: Metrics,
     # Evaluate material safety
     safety_score = evaluate_material_safety(state, move)
 
-    # Material safety is CRITICAL - weight it heavily
-    # A safety score of -9 (hanging queen) should override most positional gains
-    SAFETY_WEIGHT = 10.0
-
-    # Profile-specific safety adjustments
-    if profile.name == "materialist":
-        # Materialists are extra cautious about material
-        SAFETY_WEIGHT = 15.0
-    elif profile.name == "offense-first":
-        # Offense-first can take calculated risks
-        # But still shouldn't sacrifice queen for nothing
-        SAFETY_WEIGHT = 7.0
-    elif profile.name == "defense-first":
-        # Defense-first is very cautious
-        SAFETY_WEIGHT = 12.0
-
-    # Combined score
-    total_score = positional_score + (safety_score * SAFETY_WEIGHT)
+    # Combined score (profile-specific safety weighting)
+    total_score = positional_score + (safety_score * safety_weight(profile))
 
     # Hard veto: Never lose 5+ points without compensation
     if safety_score < -5.0:
@@ -218,7 +253,7 @@ def evaluate_move_with_safety(state: GameState, move: Move, metrics: Metrics,
 
     return total_score
 
-def move_priority(state: GameState, move: Move, ply: int = 0, pv_move: Optional[Tuple[int, int]] = None) -> int:
+def move_priority(state: GameState, move: Move, ply: int = 0, pv_move: Optional[int] = None) -> int:
     """
     Calculate move priority for move ordering.
     Higher priority moves are searched first for better alpha-beta pruning.
@@ -233,9 +268,13 @@ def move_priority(state: GameState, move: Move, ply: int = 0, pv_move: Optional[
     7. Other moves (0)
     """
     priority = 0
+    board = state.board
+    from_sq = move.from_sq
+    to_sq = move.to_sq
+    key = from_sq | (to_sq << 6)  # move_key(), inlined
 
     # PV move gets highest priority (from transposition table)
-    if pv_move and (move.from_sq, move.to_sq) == pv_move:
+    if key == pv_move:
         priority += 10000
 
     # Promotions get highest priority
@@ -243,33 +282,32 @@ def move_priority(state: GameState, move: Move, ply: int = 0, pv_move: Optional[
         priority += 500
 
     # Captures get high priority (MVV-LVA)
-    elif state.board[move.to_sq] != 0:
-        captured_piece = abs(state.board[move.to_sq])
-        moving_piece = abs(state.board[move.from_sq])
+    elif board[to_sq] != 0:
+        captured_piece = abs(board[to_sq])
+        moving_piece = abs(board[from_sq])
         # MVV-LVA: Most Valuable Victim - Least Valuable Attacker
         priority += captured_piece * 100 - moving_piece
 
     # Killer moves (non-captures that caused cutoffs)
     elif ply in _killer_moves:
-        move_key = (move.from_sq, move.to_sq)
-        if move_key in _killer_moves[ply]:
+        if key in _killer_moves[ply]:
             priority += 50
 
     # History heuristic: add score based on how often this move caused cutoffs
-    move_key = (move.from_sq, move.to_sq)
-    if move_key in _history_scores:
+    history = _history_scores.get(key)
+    if history is not None:
         # Scale history score to fit in priority range (0-49 to not overlap with killers)
         # Cap at 49 to keep below killer move priority
-        history_bonus = min(_history_scores[move_key] // 100, 49)
-        priority += history_bonus
+        priority += min(history // 100, 49)
 
     # Castling moves
-    if abs(move.from_sq - move.to_sq) == 2 and abs(state.board[move.from_sq]) == 6:  # King moves 2 squares
+    if abs(from_sq - to_sq) == 2 and abs(board[from_sq]) == 6:  # King moves 2 squares
         priority += 40
 
     return -priority  # Negative because we sort ascending
 
-def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha: float, beta: float, ply: int, max_depth: int = 6) -> SearchResult:
+def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha: float, beta: float, ply: int, max_depth: int = 6,
+                      hash_key: Optional[int] = None) -> SearchResult:
     """
     Quiescence search: continue searching captures until position is "quiet".
 
@@ -284,16 +322,17 @@ def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha:
         beta: Beta bound
         ply: Current ply depth (for limiting search)
         max_depth: Maximum additional plies to search in quiescence (default: 6)
+        hash_key: Zobrist hash of state, if the caller already has it
 
     Returns:
         SearchResult with evaluation and leaf metrics
     """
-    hash_key = zobrist_hash(state)
+    if hash_key is None:
+        hash_key = zobrist_hash(state)
 
     # Stand pat: evaluate the current position
     # This gives us a baseline - we can always choose not to capture
-    with profile_section("cached_compute_metrics"):
-        m = cached_compute_metrics(hash_key, state)
+    m = cached_compute_metrics(hash_key, state)
     stand_pat_score = score_s(m, profile, root_side)
 
     side = state.side_to_move
@@ -317,8 +356,7 @@ def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha:
         return SearchResult(stand_pat_score, m)
 
     # Generate only capture moves for quiescence
-    legal = generate_legal_moves(state, side)
-    captures = [mv for mv in legal if mv.is_capture]
+    captures = generate_legal_captures(state, side)
 
     # If no captures, position is quiet - return stand pat score
     if not captures:
@@ -349,7 +387,8 @@ def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha:
                 continue
 
             u = apply_move(state, mv)
-            res = quiescence_search(state, profile, root_side, alpha, beta, ply + 1, max_depth)
+            res = quiescence_search(state, profile, root_side, alpha, beta, ply + 1, max_depth,
+                                    hash_after_move(hash_key, state, u))
             undo_move(state, u)
 
             if res.scoreS > best_score:
@@ -368,7 +407,8 @@ def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha:
                 continue
 
             u = apply_move(state, mv)
-            res = quiescence_search(state, profile, root_side, alpha, beta, ply + 1, max_depth)
+            res = quiescence_search(state, profile, root_side, alpha, beta, ply + 1, max_depth,
+                                    hash_after_move(hash_key, state, u))
             undo_move(state, u)
 
             if res.scoreS < best_score:
@@ -382,7 +422,8 @@ def quiescence_search(state: GameState, profile: Profile, root_side: int, alpha:
         return SearchResult(best_score, best_metrics)
 
 
-def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: int, alpha: float, beta: float, ply: int = 0, allow_null: bool = True) -> SearchResult:
+def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: int, alpha: float, beta: float, ply: int = 0, allow_null: bool = True,
+                   hash_key: Optional[int] = None) -> SearchResult:
     """
     Alpha-beta minimax search with optimizations:
     - Transposition table with bound types
@@ -390,19 +431,24 @@ def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: in
     - PV move ordering
     - Late move reduction
     - Futility pruning
+
+    hash_key is the Zobrist hash of state when the caller already has it;
+    children get theirs by incremental update instead of a full rehash.
     """
     # Use Zobrist hash as position key (much faster than FEN)
-    hash_key = zobrist_hash(state)
+    if hash_key is None:
+        hash_key = zobrist_hash(state)
 
-    # Probe transposition table with improved bound checking
-    tt_result = probe_tt(hash_key, depth, alpha, beta)
+    # Probe transposition table; bound entries may narrow the window
+    alpha_orig, beta_orig = alpha, beta
+    tt_result, alpha, beta = probe_tt(hash_key, depth, alpha, beta)
     if tt_result is not None:
         return tt_result
 
     if depth == 0:
         # At depth 0, enter quiescence search to avoid horizon effect
-        result = quiescence_search(state, profile, root_side, alpha, beta, ply=0, max_depth=6)
-        store_tt(hash_key, result.scoreS, depth, 'exact', None, result.leaf_metrics)
+        result = quiescence_search(state, profile, root_side, alpha, beta, ply=0, max_depth=6, hash_key=hash_key)
+        store_tt(hash_key, result.scoreS, depth, _bound_flag(result.scoreS, alpha_orig, beta_orig), None, result.leaf_metrics)
         return result
 
     side = state.side_to_move
@@ -415,16 +461,17 @@ def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: in
     if allow_null and depth >= 3 and not is_in_check(state, side):
         # Try doing nothing (null move)
         state.side_to_move = opposite(side)
-        null_result = minimax_scoreS(state, profile, root_side, depth - 3, -beta, -beta + 1, ply + 1, allow_null=False)
+        null_result = minimax_scoreS(state, profile, root_side, depth - 3, -beta, -beta + 1, ply + 1, allow_null=False,
+                                     hash_key=hash_key ^ ZOBRIST_SIDE_TOGGLE)
         state.side_to_move = side
 
         if maximizing and -null_result.scoreS >= beta:
             # Null move caused beta cutoff
-            store_tt(hash_key, beta, depth, 'lower', None, current_metrics)
+            store_tt(hash_key, beta, depth, TT_LOWER, None, current_metrics)
             return SearchResult(beta, current_metrics)
         elif not maximizing and -null_result.scoreS <= alpha:
             # Null move caused alpha cutoff
-            store_tt(hash_key, alpha, depth, 'upper', None, current_metrics)
+            store_tt(hash_key, alpha, depth, TT_UPPER, None, current_metrics)
             return SearchResult(alpha, current_metrics)
 
     # Futility Pruning: at low depths, skip if position is hopeless
@@ -434,14 +481,13 @@ def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: in
 
         if maximizing and static_eval + futility_margin < alpha:
             # Even with optimistic bonus, can't reach alpha
-            store_tt(hash_key, static_eval, depth, 'upper', None, current_metrics)
+            store_tt(hash_key, static_eval, depth, TT_UPPER, None, current_metrics)
             return SearchResult(static_eval, current_metrics)
         elif not maximizing and static_eval - futility_margin > beta:
-            store_tt(hash_key, static_eval, depth, 'lower', None, current_metrics)
+            store_tt(hash_key, static_eval, depth, TT_LOWER, None, current_metrics)
             return SearchResult(static_eval, current_metrics)
 
-    with profile_section("generate_legal_moves"):
-        legal = generate_legal_moves(state, side)
+    legal = generate_legal_moves(state, side)
 
     if not legal:
         # Terminal position
@@ -452,25 +498,24 @@ def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: in
         else:
             # Stalemate
             result = SearchResult(0.0, current_metrics)
-        store_tt(hash_key, result.scoreS, depth, 'exact', None, result.leaf_metrics)
+        store_tt(hash_key, result.scoreS, depth, TT_EXACT, None, result.leaf_metrics)
         return result
 
     # PV Move Ordering: get best move from transposition table
     pv_move = get_pv_move(hash_key)
 
     # Move ordering for better alpha-beta pruning
-    with profile_section("move_ordering"):
-        legal.sort(key=lambda mv: move_priority(state, mv, ply, pv_move))
+    legal.sort(key=lambda mv: move_priority(state, mv, ply, pv_move))
 
     # Search all moves
     best_score = -1e30 if maximizing else +1e30
     best_leaf = current_metrics
     best_move = None
-    original_alpha = alpha
 
     if maximizing:
         for move_idx, mv in enumerate(legal):
             u = apply_move(state, mv)
+            child_hash = hash_after_move(hash_key, state, u)
 
             # Late Move Reduction: search later moves at reduced depth
             # Skip LMR for: first few moves, captures, promotions, checks
@@ -478,114 +523,172 @@ def minimax_scoreS(state: GameState, profile: Profile, root_side: int, depth: in
                 not mv.is_capture and not mv.is_promotion and
                 not is_in_check(state, opposite(side))):
                 # Search with reduced depth first
-                res = minimax_scoreS(state, profile, root_side, depth - 2, alpha, beta, ply + 1)
+                res = minimax_scoreS(state, profile, root_side, depth - 2, alpha, beta, ply + 1, hash_key=child_hash)
 
                 # If it looks promising, re-search at full depth
                 if res.scoreS > alpha:
-                    res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1)
+                    res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1, hash_key=child_hash)
             else:
                 # Search first few moves and tactical moves at full depth
-                res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1)
+                res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1, hash_key=child_hash)
 
             undo_move(state, u)
 
             if res.scoreS > best_score:
                 best_score = res.scoreS
                 best_leaf = res.leaf_metrics
-                best_move = (mv.from_sq, mv.to_sq)
+                best_move = move_key(mv.from_sq, mv.to_sq)
 
             alpha = max(alpha, best_score)
             if beta <= alpha:
                 # Beta cutoff - store killer move and history
                 if not mv.is_capture and not mv.is_promotion:
-                    move_key = (mv.from_sq, mv.to_sq)
+                    key = move_key(mv.from_sq, mv.to_sq)
                     if ply not in _killer_moves:
                         _killer_moves[ply] = []
-                    if move_key not in _killer_moves[ply]:
-                        _killer_moves[ply].insert(0, move_key)
+                    if key not in _killer_moves[ply]:
+                        _killer_moves[ply].insert(0, key)
                         if len(_killer_moves[ply]) > MAX_KILLERS_PER_PLY:
                             _killer_moves[ply].pop()
 
                     history_bonus = depth * depth
-                    if move_key in _history_scores:
-                        _history_scores[move_key] += history_bonus
+                    if key in _history_scores:
+                        _history_scores[key] += history_bonus
                     else:
-                        _history_scores[move_key] = history_bonus
+                        _history_scores[key] = history_bonus
 
                 # Store as lower bound (beta cutoff)
-                store_tt(hash_key, best_score, depth, 'lower', best_move, best_leaf)
+                store_tt(hash_key, best_score, depth, TT_LOWER, best_move, best_leaf)
                 return SearchResult(best_score, best_leaf)
 
-        # Determine bound type
-        if best_score <= original_alpha:
-            bound_type = 'upper'  # All moves failed low
-        else:
-            bound_type = 'exact'  # Found exact score
-
-        store_tt(hash_key, best_score, depth, bound_type, best_move, best_leaf)
+        store_tt(hash_key, best_score, depth, _bound_flag(best_score, alpha_orig, beta_orig), best_move, best_leaf)
         return SearchResult(best_score, best_leaf)
     else:
-        original_beta = beta
-
         for move_idx, mv in enumerate(legal):
             u = apply_move(state, mv)
+            child_hash = hash_after_move(hash_key, state, u)
 
             # Late Move Reduction for minimizing player
             if (move_idx >= 4 and depth >= 3 and
                 not mv.is_capture and not mv.is_promotion and
                 not is_in_check(state, opposite(side))):
                 # Search with reduced depth first
-                res = minimax_scoreS(state, profile, root_side, depth - 2, alpha, beta, ply + 1)
+                res = minimax_scoreS(state, profile, root_side, depth - 2, alpha, beta, ply + 1, hash_key=child_hash)
 
                 # If it looks promising, re-search at full depth
                 if res.scoreS < beta:
-                    res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1)
+                    res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1, hash_key=child_hash)
             else:
                 # Search first few moves and tactical moves at full depth
-                res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1)
+                res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply + 1, hash_key=child_hash)
 
             undo_move(state, u)
 
             if res.scoreS < best_score:
                 best_score = res.scoreS
                 best_leaf = res.leaf_metrics
-                best_move = (mv.from_sq, mv.to_sq)
+                best_move = move_key(mv.from_sq, mv.to_sq)
 
             beta = min(beta, best_score)
             if beta <= alpha:
                 # Alpha cutoff - store killer move and history
                 if not mv.is_capture and not mv.is_promotion:
-                    move_key = (mv.from_sq, mv.to_sq)
+                    key = move_key(mv.from_sq, mv.to_sq)
                     if ply not in _killer_moves:
                         _killer_moves[ply] = []
-                    if move_key not in _killer_moves[ply]:
-                        _killer_moves[ply].insert(0, move_key)
+                    if key not in _killer_moves[ply]:
+                        _killer_moves[ply].insert(0, key)
                         if len(_killer_moves[ply]) > MAX_KILLERS_PER_PLY:
                             _killer_moves[ply].pop()
 
                     history_bonus = depth * depth
-                    if move_key in _history_scores:
-                        _history_scores[move_key] += history_bonus
+                    if key in _history_scores:
+                        _history_scores[key] += history_bonus
                     else:
-                        _history_scores[move_key] = history_bonus
+                        _history_scores[key] = history_bonus
 
                 # Store as upper bound (alpha cutoff)
-                store_tt(hash_key, best_score, depth, 'upper', best_move, best_leaf)
+                store_tt(hash_key, best_score, depth, TT_UPPER, best_move, best_leaf)
                 return SearchResult(best_score, best_leaf)
 
-        # Determine bound type
-        if best_score >= original_beta:
-            bound_type = 'lower'  # All moves failed high
-        else:
-            bound_type = 'exact'  # Found exact score
-
-        store_tt(hash_key, best_score, depth, bound_type, best_move, best_leaf)
+        store_tt(hash_key, best_score, depth, _bound_flag(best_score, alpha_orig, beta_orig), best_move, best_leaf)
         return SearchResult(best_score, best_leaf)
 
-def choose_best_move_at_depth(state: GameState, profile: Profile, depthN: int, move_order: Optional[list[Move]] = None) -> tuple[Optional[Move], list[Move]]:
+def _get_root_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the worker pool used for root splitting (None on single-core hosts)."""
+    global _root_pool
+    cores = os.cpu_count() or 1
+    if cores < 2:
+        return None
+    if _root_pool is None:
+        _root_pool = ProcessPoolExecutor(max_workers=cores)
+        atexit.register(shutdown_root_pool)
+    return _root_pool
+
+def shutdown_root_pool() -> None:
+    """Stop the root-splitting worker processes, if they were started."""
+    global _root_pool
+    if _root_pool is not None:
+        _root_pool.shutdown()
+        _root_pool = None
+
+def _search_root_move(job: tuple) -> Tuple[float, Metrics, float]:
+    """
+    Worker entry point: search a single root move in a separate process.
+
+    The position is shipped as FEN and the move as UCI so the job pickles cheaply;
+    the worker rebuilds the state and searches with its own transposition table.
+
+    Returns:
+        (scoreS, leaf_metrics, safety_score)
+    """
+    global _worker_tt_generation
+    fen, uci, profile, depth, alpha, beta, with_safety, generation = job
+
+    if generation != _worker_tt_generation:
+        clear_transposition_table()
+        _worker_tt_generation = generation
+
+    state = parse_fen(fen)
+    root_side = state.side_to_move
+    mv = next(m for m in generate_legal_moves(state, root_side) if m.uci() == uci)
+
+    safety_score = evaluate_material_safety(state, mv) if with_safety else 0.0
+
+    u = apply_move(state, mv)
+    res = minimax_scoreS(state, profile, root_side, depth, alpha, beta, ply=1)
+    undo_move(state, u)
+
+    return res.scoreS, res.leaf_metrics, safety_score
+
+def search_root_moves_parallel(state: GameState, profile: Profile, legal: List[Move], depth: int,
+                               alpha: float, beta: float,
+                               with_safety: bool = False) -> Optional[List[Tuple[float, Metrics, float]]]:
+    """
+    Search every root move in the process pool.
+
+    Returns one (scoreS, leaf_metrics, safety_score) tuple per move in `legal`,
+    or None when the position is too small to be worth splitting (fewer than
+    PARALLEL_MIN_ROOT_MOVES moves) or only one core is available.
+    """
+    if len(legal) < PARALLEL_MIN_ROOT_MOVES:
+        return None
+    pool = _get_root_pool()
+    if pool is None:
+        return None
+
+    fen = to_fen(state)
+    jobs = [(fen, mv.uci(), profile, depth, alpha, beta, with_safety, _tt_generation)
+            for mv in legal]
+    return list(pool.map(_search_root_move, jobs))
+
+def choose_best_move_at_depth(state: GameState, profile: Profile, depthN: int, move_order: Optional[list[Move]] = None,
+                              parallel: bool = False) -> tuple[Optional[Move], list[Move]]:
     """
     Choose best move at a specific depth.
 
+    If `parallel` is True, root moves are searched in worker processes.
+
     Returns:
         (best_move, ordered_moves) - best move and moves ordered by score for next iteration
     """
@@ -598,53 +701,55 @@ def choose_best_move_at_depth(state: GameState, profile: Profile, depthN: int, m
     # Use provided move ordering from previous iteration, or default ordering
     if move_order:
         # Reorder legal moves to match the provided order
-        move_set = set((m.from_sq, m.to_sq) for m in legal)
+        move_set = set(move_key(m.from_sq, m.to_sq) for m in legal)
         ordered = []
         for m in move_order:
-            if (m.from_sq, m.to_sq) in move_set:
+            if move_key(m.from_sq, m.to_sq) in move_set:
                 ordered.append(m)
         # Add any new moves not in the previous order
-        ordered_set = set((m.from_sq, m.to_sq) for m in ordered)
+        ordered_set = set(move_key(m.from_sq, m.to_sq) for m in ordered)
         for m in legal:
-            if (m.from_sq, m.to_sq) not in ordered_set:
+            if move_key(m.from_sq, m.to_sq) not in ordered_set:
                 ordered.append(m)
         legal = ordered
 
     root_hash = zobrist_hash(state)
     root_metrics = cached_compute_metrics(root_hash, state)
     root_dPV, _, root_dOV, _ = deltas(root_metrics)
+    weight = safety_weight(profile)
 
     best_mv = None
     best_key = None
     move_scores = []  # (score, move) for ordering next iteration
 
-    for mv in legal:
-        safety_score = evaluate_material_safety(state, mv)
+    results = None
+    if parallel:
+        results = search_root_moves_parallel(state, profile, legal, depthN-1, -1e30, +1e30, with_safety=True)
 
-        u = apply_move(state, mv)
-        res = minimax_scoreS(state, profile, root_side, depthN-1, -1e30, +1e30, ply=1)
-        undo_move(state, u)
+    for idx, mv in enumerate(legal):
+        if results is not None:
+            scoreS, leaf_metrics, safety_score = results[idx]
+        else:
+            safety_score = evaluate_material_safety(state, mv)
 
-        leaf_dPV, _, leaf_dOV, _ = deltas(res.leaf_metrics)
+            u = apply_move(state, mv)
+            res = minimax_scoreS(state, profile, root_side, depthN-1, -1e30, +1e30, ply=1,
+                                 hash_key=hash_after_move(root_hash, state, u))
+            undo_move(state, u)
+            scoreS, leaf_metrics = res.scoreS, res.leaf_metrics
+
+        leaf_dPV, _, leaf_dOV, _ = deltas(leaf_metrics)
         dPV_swing = leaf_dPV - root_dPV
         dOV_swing = leaf_dOV - root_dOV
 
-        SAFETY_WEIGHT = 10.0
-        if profile.name == "materialist":
-            SAFETY_WEIGHT = 15.0
-        elif profile.name == "offense-first":
-            SAFETY_WEIGHT = 7.0
-        elif profile.name == "defense-first":
-            SAFETY_WEIGHT = 12.0
-
-        safety_adjusted_score = res.scoreS + (safety_score * SAFETY_WEIGHT)
+        safety_adjusted_score = scoreS + (safety_score * weight)
 
         if safety_score < -5.0:
             if not has_adequate_compensation(state, mv, abs(safety_score)):
                 safety_adjusted_score = -MATE / 2
 
         uci = mv.uci()
-        cand = (safety_adjusted_score, res.scoreS, dPV_swing, dOV_swing, uci)
+        cand = (safety_adjusted_score, scoreS, dPV_swing, dOV_swing, uci)
 
         move_scores.append((safety_adjusted_score, mv))
 
@@ -660,10 +765,14 @@ def choose_best_move_at_depth(state: GameState, profile: Profile, depthN: int, m
 
 def choose_best_move_at_depth_windowed(state: GameState, profile: Profile, depth: int,
                                        move_order: Optional[list[Move]],
-                                       alpha: float, beta: float) -> tuple[Optional[Move], list[Move], float]:
+                                       alpha: float, beta: float,
+                                       parallel: bool = False) -> tuple[Optional[Move], list[Move], float]:
     """
     Choose best move at a specific depth with aspiration window.
 
+    If `parallel` is True, root moves are searched in worker processes; every
+    worker starts from the initial window since alpha cannot be shared.
+
     Returns:
         (best_move, ordered_moves, score) - best move, moves ordered by score, and best score
     """
@@ -673,26 +782,35 @@ def choose_best_move_at_depth_windowed(state: GameState, profile: Profile, depth
     if not legal:
         return None, [], 0.0
 
+    root_hash = zobrist_hash(state)
     if move_order:
         legal = move_order + [mv for mv in legal if mv not in move_order]
     else:
-        hash_key = zobrist_hash(state)
-        pv_move = get_pv_move(hash_key)
+        pv_move = get_pv_move(root_hash)
         legal.sort(key=lambda mv: move_priority(state, mv, 0, pv_move))
 
     best_mv = None
     best_score = -1e30
     move_scores = []
 
-    for mv in legal:
-        u = apply_move(state, mv)
-        res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply=1)
-        undo_move(state, u)
+    results = None
+    if parallel:
+        results = search_root_moves_parallel(state, profile, legal, depth - 1, alpha, beta)
+
+    for idx, mv in enumerate(legal):
+        if results is not None:
+            scoreS = results[idx][0]
+        else:
+            u = apply_move(state, mv)
+            res = minimax_scoreS(state, profile, root_side, depth - 1, alpha, beta, ply=1,
+                                 hash_key=hash_after_move(root_hash, state, u))
+            undo_move(state, u)
+            scoreS = res.scoreS
 
-        move_scores.append((res.scoreS, mv))
+        move_scores.append((scoreS, mv))
 
-        if res.scoreS > best_score:
-            best_score = res.scoreS
+        if scoreS > best_score:
+            best_score = scoreS
             best_mv = mv
             alpha = max(alpha, best_score)
 
@@ -702,7 +820,8 @@ def choose_best_move_at_depth_windowed(state: GameState, profile: Profile, depth
     return best_mv, ordered_moves, best_score
 
 @profile_function
-def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_iterative_deepening: bool = True) -> Optional[Move]:
+def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_iterative_deepening: bool = True,
+                     parallel: bool = False, tt: Optional[Dict[int, TTEntry]] = None) -> Optional[Move]:
     """
     Choose the best move using iterative deepening with aspiration windows.
 
@@ -718,10 +837,33 @@ def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_it
         profile: Evaluation profile
         depthN: Maximum depth to search
         use_iterative_deepening: If False, search only at depthN (for testing)
+        parallel: If True, split root moves across worker processes
+        tt: Transposition table to use instead of the shared one for this
+            search (e.g. {} for an isolated search without clearing the
+            shared table). The search then also starts from empty killer and
+            history tables, so its move ordering does not depend on earlier
+            searches. The metrics cache is keyed by position and stays shared.
+            Root-split workers always use their own tables.
+
+    Passing tt swaps module-level tables for the duration of the call, so it
+    isolates consecutive searches, not concurrent ones in the same process.
     """
+    global _transposition_table, _killer_moves, _history_scores
+    if tt is None:
+        return _choose_best_move(state, profile, depthN, use_iterative_deepening, parallel)
+
+    shared = _transposition_table, _killer_moves, _history_scores
+    _transposition_table, _killer_moves, _history_scores = tt, {}, {}
+    try:
+        return _choose_best_move(state, profile, depthN, use_iterative_deepening, parallel)
+    finally:
+        _transposition_table, _killer_moves, _history_scores = shared
+
+def _choose_best_move(state: GameState, profile: Profile, depthN: int, use_iterative_deepening: bool,
+                      parallel: bool) -> Optional[Move]:
     if not use_iterative_deepening:
         # Direct search at target depth (old behavior)
-        best_mv, _ = choose_best_move_at_depth(state, profile, depthN)
+        best_mv, _ = choose_best_move_at_depth(state, profile, depthN, parallel=parallel)
         return best_mv
 
     # Iterative deepening with aspiration windows
@@ -733,7 +875,7 @@ def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_it
         if depth == 1:
             # First iteration: use full window
             best_move, move_order, prev_score = choose_best_move_at_depth_windowed(
-                state, profile, depth, move_order, -1e30, 1e30)
+                state, profile, depth, move_order, -1e30, 1e30, parallel)
         else:
             # Use aspiration window based on previous score
             window = 0.5  # Narrow window
@@ -741,7 +883,7 @@ def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_it
 
             # Try narrow window first
             best_move, move_order, score = choose_best_move_at_depth_windowed(
-                state, profile, depth, move_order, alpha, beta)
+                state, profile, depth, move_order, alpha, beta, parallel)
 
             # If search failed (score outside window), re-search with full window
             if score <= alpha or score >= beta:
@@ -749,12 +891,12 @@ def choose_best_move(state: GameState, profile: Profile, depthN: int = 3, use_it
                 window = 2.0
                 alpha, beta = prev_score - window, prev_score + window
                 best_move, move_order, score = choose_best_move_at_depth_windowed(
-                    state, profile, depth, move_order, alpha, beta)
+                    state, profile, depth, move_order, alpha, beta, parallel)
 
                 # If still failed, use full window
                 if score <= alpha or score >= beta:
                     best_move, move_order, score = choose_best_move_at_depth_windowed(
-                        state, profile, depth, move_order, -1e30, 1e30)
+                        state, profile, depth, move_order, -1e30, 1e30, parallel)
 
             prev_score = score
 
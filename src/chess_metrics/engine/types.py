@@ -1,5 +1,5 @@
 ﻿from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, List, Tuple
 
 WHITE = 1
@@ -48,17 +48,42 @@ def value_of_piece(p: int) -> int:
 def opposite(side: int) -> int:
     return WHITE if side == BLACK else BLACK
 
+# Square names indexed by square (a1 = 0, h8 = 63)
+_ALG = tuple(chr(ord('a') + sq % 8) + chr(ord('1') + sq // 8) for sq in range(64))
+
+# Square index in UCI string order (file letter first, then rank digit)
+_UCI_ORDER = tuple((sq % 8) * 8 + sq // 8 for sq in range(64))
+
 def sq_to_alg(sq: int) -> str:
-    f = sq % 8
-    r = sq // 8
-    return chr(ord('a') + f) + chr(ord('1') + r)
+    return _ALG[sq]
 
 def alg_to_sq(a: str) -> int:
     f = ord(a[0]) - ord('a')
     r = ord(a[1]) - ord('1')
     return r * 8 + f
 
-@dataclass(frozen=True)
+# Packed move encoding: a move as a single small int, for compact tables and
+# cheap dict keys.
+#   from_sq (6) | to_sq (6) | moving_kind (3) | captured_kind (3) | flags (4) | promotion_kind (3)
+# The low 12 bits (from/to) alone identify a move for killer/history/PV tables.
+MOVE_TO_SHIFT = 6
+MOVE_MK_SHIFT = 12
+MOVE_CK_SHIFT = 15
+MOVE_FLAG_SHIFT = 18
+MOVE_PROMO_SHIFT = 22
+SQ_MASK = 0x3F
+KIND_MASK = 0x7
+
+FLAG_CAPTURE = 1
+FLAG_EP = 2
+FLAG_CASTLE = 4
+FLAG_PROMOTION = 8
+
+def move_key(from_sq: int, to_sq: int) -> int:
+    """From/to part of a packed move (12 bits)."""
+    return from_sq | (to_sq << MOVE_TO_SHIFT)
+
+@dataclass(frozen=True, slots=True)
 class Move:
     from_sq: int
     to_sq: int
@@ -69,14 +94,55 @@ class Move:
     is_castle: bool = False
     is_promotion: bool = False
     promotion_kind: int = QUEEN
+    # uci() string, built on first call; not an init argument and not compared
+    _uci: str = field(init=False, repr=False, compare=False)
 
     def uci(self) -> str:
-        s = sq_to_alg(self.from_sq) + sq_to_alg(self.to_sq)
-        if self.is_promotion:
-            s += "q"  # locked
+        s = getattr(self, "_uci", None)
+        if s is None:
+            s = _ALG[self.from_sq] + _ALG[self.to_sq]
+            if self.is_promotion:
+                s += "q"  # locked
+            object.__setattr__(self, "_uci", s)
         return s
 
-@dataclass
+    def uci_order(self) -> int:
+        """Sort key giving the same order as uci(), without building the string."""
+        # A from/to pair never has both a promotion and a non-promotion move
+        return (_UCI_ORDER[self.from_sq] << 6) | _UCI_ORDER[self.to_sq]
+
+    def pack(self) -> int:
+        """Encode this move as a single int (see MOVE_*_SHIFT)."""
+        flags = ((FLAG_CAPTURE if self.is_capture else 0) | (FLAG_EP if self.is_ep else 0) |
+                 (FLAG_CASTLE if self.is_castle else 0) | (FLAG_PROMOTION if self.is_promotion else 0))
+        return (self.from_sq
+                | (self.to_sq << MOVE_TO_SHIFT)
+                | (self.moving_kind << MOVE_MK_SHIFT)
+                | (self.captured_kind << MOVE_CK_SHIFT)
+                | (flags << MOVE_FLAG_SHIFT)
+                | (self.promotion_kind << MOVE_PROMO_SHIFT))
+
+    @staticmethod
+    def unpack(code: int) -> "Move":
+        """Inverse of Move.pack()."""
+        flags = code >> MOVE_FLAG_SHIFT
+        return Move(
+            code & SQ_MASK,
+            (code >> MOVE_TO_SHIFT) & SQ_MASK,
+            (code >> MOVE_MK_SHIFT) & KIND_MASK,
+            captured_kind=(code >> MOVE_CK_SHIFT) & KIND_MASK,
+            is_capture=bool(flags & FLAG_CAPTURE),
+            is_ep=bool(flags & FLAG_EP),
+            is_castle=bool(flags & FLAG_CASTLE),
+            is_promotion=bool(flags & FLAG_PROMOTION),
+            promotion_kind=(code >> MOVE_PROMO_SHIFT) & KIND_MASK,
+        )
+
+    def __reduce__(self):
+        # Pickle as the packed int (the _uci slot may be unset)
+        return (Move.unpack, (self.pack(),))
+
+@dataclass(slots=True)
 class Undo:
     move: Move
     captured_piece: int
@@ -92,7 +158,7 @@ class Undo:
     moved_piece_before: int
     to_piece_before: int
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     board: List[int]               # len 64
     side_to_move: int              # WHITE or BLACK
@@ -105,3 +171,8 @@ class GameState:
     @staticmethod
     def empty() -> "GameState":
         return GameState([0]*64, WHITE, 0, -1, 0, 1, [])
+
+    def clone(self) -> "GameState":
+        """Independent copy: board and undo stack are copied, undo entries shared."""
+        return GameState(self.board[:], self.side_to_move, self.castling_rights, self.ep_sq,
+                         self.halfmove_clock, self.fullmove_number, self.undo_stack[:])
@@ -7,10 +7,10 @@ and provides O(1) hash computation.
 """
 from __future__ import annotations
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
-    from .types import GameState
+    from .types import GameState, Undo
 
 # Zobrist hash tables (initialized once at module load)
 # We use 64-bit integers for hash values
@@ -51,6 +51,22 @@ for i in range(9):
 ZOBRIST_SIDE[0] = _random_u64()
 ZOBRIST_SIDE[1] = _random_u64()
 
+# "Empty square" and "no EP" slots hash to zero, so XOR-ing them is a no-op
+# and incremental updates need no branches for absent captures/EP squares.
+for sq in range(64):
+    ZOBRIST_PIECES[sq][6] = 0
+ZOBRIST_EP[0] = 0
+
+# Flat read-only copy of the piece table, indexed by sq*13 + piece + 6.
+# One tuple lookup instead of two nested list lookups for scalar fetches.
+_ZP = tuple(key for row in ZOBRIST_PIECES for key in row)
+
+# Index into ZOBRIST_EP by ep_sq + 1 (ep_sq == -1 -> slot 0)
+_EP_INDEX = [0] + [(sq % 8) + 1 for sq in range(64)]
+
+# XOR-ing this flips the side to move (also the whole update for a null move)
+ZOBRIST_SIDE_TOGGLE = ZOBRIST_SIDE[0] ^ ZOBRIST_SIDE[1]
+
 
 def zobrist_hash(state: GameState) -> int:
     """
@@ -68,20 +84,18 @@ def zobrist_hash(state: GameState) -> int:
     """
     h = 0
     
-    # Hash pieces on board
-    for sq, piece in enumerate(state.board):
-        if piece != 0:
+    # Hash pieces on board (zip walks both sequences without index arithmetic,
+    # which measures faster than flat-table indexing for a full rescan)
+    for keys, piece in zip(ZOBRIST_PIECES, state.board):
+        if piece:
             # Convert piece value (-6 to +6) to array index (0 to 12)
-            piece_idx = piece + 6
-            h ^= ZOBRIST_PIECES[sq][piece_idx]
+            h ^= keys[piece + 6]
     
     # Hash castling rights
     h ^= ZOBRIST_CASTLING[state.castling_rights]
     
-    # Hash en passant square
-    # Convert -1 (no EP) to 0, and 0-63 to file+1
-    ep_idx = 0 if state.ep_sq == -1 else (state.ep_sq % 8) + 1
-    h ^= ZOBRIST_EP[ep_idx]
+    # Hash en passant square (-1 -> no EP, 0-63 -> file+1)
+    h ^= ZOBRIST_EP[_EP_INDEX[state.ep_sq + 1]]
     
     # Hash side to move
     side_idx = 0 if state.side_to_move == 1 else 1  # WHITE=1 -> idx 0, BLACK=-1 -> idx 1
@@ -91,11 +105,16 @@ def zobrist_hash(state: GameState) -> int:
 
 
 def incremental_hash_move(prev_hash: int, state: GameState, from_sq: int, to_sq: int, 
-                          moved_piece: int, captured_piece: int = 0) -> int:
+                          moved_piece: int, captured_piece: int = 0,
+                          prev_castling: Optional[int] = None,
+                          prev_ep_sq: Optional[int] = None) -> int:
     """
     Update Zobrist hash incrementally after a move.
     
     This is even faster than full hash computation - only XOR the changed squares.
+    The update is straight-line: an empty capture slot and "no EP" hash to zero,
+    and unchanged castling/EP state XORs out to zero. Covers ordinary moves and
+    captures; castling, en passant and promotion need hash_after_move.
     
     Args:
         prev_hash: Hash before the move
@@ -104,30 +123,56 @@ def incremental_hash_move(prev_hash: int, state: GameState, from_sq: int, to_sq:
         to_sq: Destination square
         moved_piece: Piece that moved
         captured_piece: Piece that was captured (0 if none)
+        prev_castling: Castling rights before the move (None if unchanged)
+        prev_ep_sq: En passant square before the move (None if unchanged)
         
     Returns:
         Updated hash value
     """
-    h = prev_hash
+    if prev_castling is None:
+        prev_castling = state.castling_rights
+    if prev_ep_sq is None:
+        prev_ep_sq = state.ep_sq
+    from_base = from_sq * 13 + 6
+    to_base = to_sq * 13 + 6
     
-    # Remove piece from source square
-    piece_idx = moved_piece + 6
-    h ^= ZOBRIST_PIECES[from_sq][piece_idx]
-    
-    # Remove captured piece from destination (if any)
-    if captured_piece != 0:
-        cap_idx = captured_piece + 6
-        h ^= ZOBRIST_PIECES[to_sq][cap_idx]
-    
-    # Add piece to destination square
-    h ^= ZOBRIST_PIECES[to_sq][piece_idx]
-    
-    # Toggle side to move
-    h ^= ZOBRIST_SIDE[0]
-    h ^= ZOBRIST_SIDE[1]
+    return (prev_hash
+            ^ _ZP[from_base + moved_piece]        # lift piece from source
+            ^ _ZP[to_base + captured_piece]       # remove captured piece (no-op if 0)
+            ^ _ZP[to_base + moved_piece]          # drop piece on destination
+            ^ ZOBRIST_CASTLING[prev_castling] ^ ZOBRIST_CASTLING[state.castling_rights]
+            ^ ZOBRIST_EP[_EP_INDEX[prev_ep_sq + 1]] ^ ZOBRIST_EP[_EP_INDEX[state.ep_sq + 1]]
+            ^ ZOBRIST_SIDE_TOGGLE)
+
+
+def hash_after_move(prev_hash: int, state: GameState, undo: Undo) -> int:
+    """
+    Update Zobrist hash after apply_move, for any move.
     
-    # Note: Castling rights and EP square changes would need to be handled separately
-    # For now, we'll use full hash computation when those change
+    The undo record apply_move returns has everything the update needs: the
+    captured piece and its square (not the destination for en passant), the
+    castling rook's move, and the previous castling rights and EP square. The
+    piece left on the destination is read from the board, so promotions hash
+    the promoted piece.
     
+    Args:
+        prev_hash: Hash before the move
+        state: Current game state (after move)
+        undo: Undo record returned by apply_move
+        
+    Returns:
+        Updated hash value
+    """
+    m = undo.move
+    to_sq = m.to_sq
+    h = (prev_hash
+         ^ _ZP[m.from_sq * 13 + 6 + undo.moved_piece_before]
+         ^ _ZP[to_sq * 13 + 6 + state.board[to_sq]]
+         ^ ZOBRIST_CASTLING[undo.prev_castling_rights] ^ ZOBRIST_CASTLING[state.castling_rights]
+         ^ ZOBRIST_EP[_EP_INDEX[undo.prev_ep_sq + 1]] ^ ZOBRIST_EP[_EP_INDEX[state.ep_sq + 1]]
+         ^ ZOBRIST_SIDE_TOGGLE)
+    if undo.captured_piece:
+        h ^= _ZP[undo.captured_sq * 13 + 6 + undo.captured_piece]
+    if undo.rook_piece:
+        h ^= _ZP[undo.rook_from * 13 + 6 + undo.rook_piece] ^ _ZP[undo.rook_to * 13 + 6 + undo.rook_piece]
     return h
-
@@ -3,28 +3,55 @@ Flask web application for chess metrics viewer.
 """
 from __future__ import annotations
 import os
-from flask import Flask, render_template, jsonify, request
-from typing import Optional
+import atexit
+import sqlite3
+from collections import OrderedDict
+import numpy as np
+from flask import Flask, render_template, jsonify, request, g, stream_with_context
+from typing import Iterator, List, Optional, Tuple
 
 from chess_metrics.db.repo import Repo
+from chess_metrics.db.pool import RepoPool
 from chess_metrics.analysis import (
-    detect_blunders, find_critical_positions, calculate_statistics
+    Blunder, detect_blunders, find_critical_positions, calculate_statistics, metrics_matrix
 )
 from chess_metrics.web.profiling import (
     profile_function, profile_section, get_timing_stats, clear_timing_data
 )
+from chess_metrics.web.json_provider import make_json_provider, make_json_response, json_bytes
+from chess_metrics.web.compression import gzip_json_response
 
+# Encoded /api/analysis bodies kept per app
+ANALYSIS_CACHE_SIZE = 256
 
-def create_app(db_path: str = "chess.sqlite") -> Flask:
+
+def create_app(db_path: str = "chess.sqlite", pool_size: int = 4) -> Flask:
     """Create and configure Flask application."""
     app = Flask(__name__)
+    app.json = make_json_provider(app)
     app.config['DATABASE'] = db_path
+    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
     app.config['TEMPLATES_AUTO_RELOAD'] = True
     app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
     
-    # Get database connection
+    # Connections are pooled for the life of the process; each request checks
+    # one out on first use and returns it in teardown_request
+    pool = RepoPool(db_path, size=pool_size)
+    app.extensions['repo_pool'] = pool
+    atexit.register(pool.close)
+
+    app.after_request(gzip_json_response)
+
     def get_repo() -> Repo:
-        return Repo.open(app.config['DATABASE'])
+        if 'repo' not in g:
+            g.repo = pool.acquire()
+        return g.repo
+
+    @app.teardown_request
+    def release_repo(exc: Optional[BaseException]) -> None:
+        repo = g.pop('repo', None)
+        if repo is not None:
+            pool.release(repo)
     
     @app.route('/')
     def index():
@@ -40,45 +67,25 @@ def create_app(db_path: str = "chess.sqlite") -> Flask:
     @profile_function
     def api_games():
         """Get list of all games."""
-        repo = get_repo()
         try:
-            with profile_section("get_all_game_ids"):
-                game_ids = repo.get_all_game_ids()
-
-            # Get details for each game
-            games = []
-            with profile_section("fetch_game_details"):
-                for gid in game_ids:
-                    game_data = repo.get_game_for_pgn(gid)
-                    if game_data:
-                        g = game_data['game']
-                        games.append({
-                            'game_id': g['game_id'],
-                            'white_name': g['white_name'],
-                            'black_name': g['black_name'],
-                            'result': g['result'],
-                            'termination': g['termination'],
-                            'created_utc': g['created_utc'],
-                            'move_count': len(game_data['moves'])
-                        })
-
-            repo.close()
+            repo = get_repo()
+            with profile_section("list_games_summary"):
+                games = [dict(row) for row in repo.list_games_summary()]
+
             return jsonify(games)
         except Exception as e:
-            repo.close()
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/game/<int:game_id>')
     @profile_function
     def api_game(game_id: int):
         """Get game details with moves and metrics."""
-        repo = get_repo()
         try:
+            repo = get_repo()
             with profile_section("get_game_for_analysis"):
                 game_data = repo.get_game_for_analysis(game_id)
 
             if not game_data:
-                repo.close()
                 return jsonify({'error': 'Game not found'}), 404
 
             # Format response
@@ -88,87 +95,121 @@ def create_app(db_path: str = "chess.sqlite") -> Flask:
                     'positions': game_data['positions']
                 }
 
-            repo.close()
             return jsonify(response)
         except Exception as e:
-            repo.close()
             return jsonify({'error': str(e)}), 500
     
-    @app.route('/api/analysis/<int:game_id>')
-    @profile_function
-    def api_analysis(game_id: int):
-        """Get game analysis."""
-        repo = get_repo()
-        try:
-            with profile_section("get_game_for_analysis_2"):
-                game_data = repo.get_game_for_analysis(game_id)
-
-            if not game_data:
-                repo.close()
-                return jsonify({'error': 'Game not found'}), 404
-
-            positions = game_data['positions']
-
-            # Perform analysis
-            with profile_section("detect_blunders"):
-                blunders = detect_blunders(positions)
+    # Encoded analysis bodies keyed by (game_id, positions version): a repeat
+    # request for an unchanged game skips the analysis and encoding entirely,
+    # and any write to the game's positions changes the key. Oldest first out.
+    # Bodies are also persisted in the game_analysis table, so they survive
+    # restarts and are shared between processes.
+    analysis_cache: "OrderedDict[Tuple[int, Tuple[int, int]], bytes]" = OrderedDict()
+
+    def remember_analysis(key: Tuple[int, Tuple[int, int]], body: bytes) -> None:
+        analysis_cache[key] = body
+        if len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+            analysis_cache.popitem(last=False)
+
+    def stream_analysis(key: Tuple[int, Tuple[int, int]], positions: List[dict],
+                        metrics: np.ndarray, blunders: List[Blunder],
+                        first: bytes) -> Iterator[bytes]:
+        """
+        Yield the JSON body one section at a time, so the first bytes go out
+        while later sections are still being computed. `first` is the
+        already-encoded blunders section, built before the response started.
+        The joined body is cached once the last section has been produced.
+
+        The status line has been sent by the time the later sections run, so
+        a failure there cannot become a 500: the exception is logged, the
+        object is closed with an "error" member so the body is still valid
+        JSON, and nothing is cached.
+        """
+        chunks: List[bytes] = [first]
+        yield first
 
+        try:
             with profile_section("find_critical_positions"):
-                critical_positions = find_critical_positions(positions)
+                critical_positions = find_critical_positions(positions, metrics=metrics)
+            chunks.append(b',"critical_positions":' + json_bytes(critical_positions))
+            yield chunks[-1]
 
             with profile_section("calculate_statistics"):
-                stats = calculate_statistics(positions, blunders)
+                stats = calculate_statistics(positions, blunders, metrics=metrics)
+            chunks.append(b',"statistics":' + json_bytes(stats) + b'}')
+        except Exception as e:
+            app.logger.exception("Analysis of game %d failed mid-stream", key[0])
+            yield b',"error":' + json_bytes(str(e)) + b'}'
+            return
+        yield chunks[-1]
 
-            # Format response
-            with profile_section("format_analysis_response"):
-                response = {
-                    'blunders': [
-                        {
-                            'ply': b.ply,
-                            'side': b.side,
-                            'san': b.san,
-                            'metric': b.metric,
-                            'delta': b.delta,
-                            'before': b.before,
-                            'after': b.after,
-                            'severity': b.severity
-                        }
-                        for b in blunders
-                    ],
-                    'critical_positions': [
-                        {
-                            'ply': cp.ply,
-                            'fen': cp.fen,
-                            'san': cp.san,
-                            'reason': cp.reason,
-                            'metrics': cp.metrics
-                        }
-                        for cp in critical_positions
-                    ],
-                    'statistics': {
-                        'total_moves': stats.total_moves,
-                        'white_blunders': stats.white_blunders,
-                        'black_blunders': stats.black_blunders,
-                        'white_mistakes': stats.white_mistakes,
-                        'black_mistakes': stats.black_mistakes,
-                        'white_inaccuracies': stats.white_inaccuracies,
-                        'black_inaccuracies': stats.black_inaccuracies,
-                        'avg_pv_white': stats.avg_pv_white,
-                        'avg_pv_black': stats.avg_pv_black,
-                        'avg_mv_white': stats.avg_mv_white,
-                        'avg_mv_black': stats.avg_mv_black,
-                        'avg_ov_white': stats.avg_ov_white,
-                        'avg_ov_black': stats.avg_ov_black,
-                        'avg_dv_white': stats.avg_dv_white,
-                        'avg_dv_black': stats.avg_dv_black,
-                        'turning_points': stats.turning_points
-                    }
-                }
+        body = b''.join(chunks)
+        remember_analysis(key, body)
+        try:
+            with pool.writer() as repo:
+                repo.save_analysis_payload(key[0], key[1], body)
+        except sqlite3.Error:
+            pass  # not persisted (e.g. database not migrated); memory cache still has it
 
-            repo.close()
-            return jsonify(response)
+    @app.route('/api/analysis/<int:game_id>')
+    @profile_function
+    def api_analysis(game_id: int):
+        """
+        Get game analysis.
+
+        The ETag is derived from the positions version (the same key as the
+        analysis cache), so a client revalidating an unchanged game gets a
+        304 without the analysis being run or sent. It is weak because the
+        body may be sent gzip-encoded or not. A version with no positions
+        (which is also what an unknown game id gives) never short-circuits,
+        so a missing game still gets its 404.
+        """
+        try:
+            version = get_repo().positions_version(game_id)
+            etag = f"{game_id}-{version[0]}-{version[1]}"
+            if version[0] > 0 and request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            key = (game_id, version)
+            body = analysis_cache.get(key)
+            if body is None:
+                try:
+                    body = get_repo().get_analysis_payload(game_id, version)
+                except sqlite3.OperationalError:
+                    body = None  # database predates the game_analysis table
+                if body is not None:
+                    remember_analysis(key, body)
+
+            if body is not None:
+                response = make_json_response(body)
+            else:
+                with profile_section("get_game_for_analysis_2"):
+                    game_data = get_repo().get_game_for_analysis(game_id)
+
+                if not game_data:
+                    return jsonify({'error': 'Game not found'}), 404
+
+                # The metric columns and the first section are built before
+                # the response starts, so bad input still becomes a 500; the
+                # columns are shared by all three passes. The dataclasses are
+                # serialized as-is (orjson handles them natively; the stdlib
+                # fallback goes through asdict)
+                positions = game_data['positions']
+                metrics = metrics_matrix(positions)
+                with profile_section("detect_blunders"):
+                    blunders = detect_blunders(positions, metrics=metrics)
+                first = b'{"blunders":' + json_bytes(blunders)
+
+                response = app.response_class(
+                    stream_with_context(stream_analysis(key, positions, metrics, blunders, first)),
+                    mimetype='application/json'
+                )
+
+            response.set_etag(etag, weak=True)
+            return response
         except Exception as e:
-            repo.close()
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/profiling')
@@ -0,0 +1,37 @@
+"""
+gzip compression for JSON API responses, using only the standard library.
+
+Registered as an after_request hook: bodies are compressed when the client
+sends Accept-Encoding: gzip and the payload is big enough to be worth it.
+Streamed responses are passed through untouched.
+"""
+from __future__ import annotations
+import gzip
+
+from flask import Response, request
+
+# Smaller bodies fit in a packet or two anyway; compressing them only costs CPU
+MIN_COMPRESS_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+
+def gzip_json_response(response: Response) -> Response:
+    """Compress a successful JSON response if the client accepts gzip."""
+    if (response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.is_streamed or 'gzip' not in request.accept_encodings:
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    # mtime=0 keeps the output deterministic for identical bodies
+    response.set_data(gzip.compress(data, COMPRESS_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,88 @@
+"""
+JSON serialization for the web API.
+
+Uses orjson when it is installed (serialization runs in native code and
+produces bytes directly); otherwise falls back to Flask's stdlib provider.
+"""
+from __future__ import annotations
+import dataclasses
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, Tuple
+
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    # Optional dependency - Flask's built-in json is used instead
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+@lru_cache(maxsize=None)
+def _field_getter(cls: type) -> Tuple[Tuple[str, ...], Callable[[Any], tuple]]:
+    """Field names of a dataclass plus one attrgetter that reads them all."""
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    return names, attrgetter(*names)
+
+
+def _dataclass_dict(obj: Any) -> Dict[str, Any]:
+    """
+    Shallow dict of a dataclass instance. Unlike dataclasses.asdict this does
+    not deep-copy field values; nested values are encoded by the serializer.
+    """
+    names, getter = _field_getter(type(obj))
+    values = getter(obj)
+    return dict(zip(names, values if len(names) > 1 else (values,)))
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Stdlib provider that never indents or sorts keys, even in debug mode."""
+    compact = True
+    sort_keys = False
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if dataclasses.is_dataclass(o) and not isinstance(o, type):
+            return _dataclass_dict(o)
+        return DefaultJSONProvider.default(o)
+
+
+class ORJSONProvider(CompactJSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = _ORJSON_OPTIONS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def make_json_provider(app: Flask) -> DefaultJSONProvider:
+    """Pick the fastest available JSON provider for the app."""
+    if orjson is not None:
+        return ORJSONProvider(app)
+    return CompactJSONProvider(app)
+
+
+def json_bytes(payload: Any) -> bytes:
+    """Encode a payload to compact JSON bytes (with orjson, no str round trip)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=current_app.json.default, option=_ORJSON_OPTIONS)
+    return current_app.json.dumps(payload, separators=(',', ':')).encode()
+
+
+def make_json_response(payload: Any, status: int = 200) -> Response:
+    """
+    Build a JSON response for a large payload.
+
+    Accepts already-encoded bytes as well, so cached bodies are sent as-is.
+    """
+    body = payload if isinstance(payload, bytes) else json_bytes(payload)
+    return current_app.response_class(body, status=status, mimetype='application/json')
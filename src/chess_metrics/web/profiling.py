@@ -1,69 +1,105 @@
 """
 Performance profiling utilities for the web application.
 """
+import os
 import time
 import functools
-from typing import Callable, Any
+from array import array
+from typing import Callable, Any, Dict
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-call log lines are opt-in: set CME_PROFILE_VERBOSE=1 to enable them
+_VERBOSE = bool(os.environ.get('CME_PROFILE_VERBOSE'))
+
+# Samples kept per function/section; older samples are overwritten
+RING_SIZE = 4096
+
+
+class _Timings:
+    """Fixed-size ring buffer of timings (ns) plus running call count and total."""
+    __slots__ = ('buf', 'count', 'total')
+
+    def __init__(self):
+        self.buf = array('d', bytes(8 * RING_SIZE))
+        self.count = 0
+        self.total = 0
+
+    def add(self, elapsed: int) -> None:
+        self.buf[self.count % RING_SIZE] = elapsed
+        self.count += 1
+        self.total += elapsed
+
+    def samples(self) -> array:
+        return self.buf[:min(self.count, RING_SIZE)]
+
+
 # Store timing data
-timing_data = {}
+timing_data: Dict[str, _Timings] = {}
+
+
+def _record(name: str, elapsed: int) -> None:
+    timings = timing_data.get(name)
+    if timings is None:
+        timings = timing_data[name] = _Timings()
+    timings.add(elapsed)
+    if _VERBOSE:
+        logger.info(f"⏱️  {name}: {elapsed / 1e6:.2f}ms")
 
 
 def profile_function(func: Callable) -> Callable:
     """Decorator to profile function execution time."""
+    func_name = func.__name__
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.perf_counter()
+        start_time = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        elapsed = (end_time - start_time) * 1000  # Convert to milliseconds
-        
-        func_name = func.__name__
-        if func_name not in timing_data:
-            timing_data[func_name] = []
-        timing_data[func_name].append(elapsed)
-        
-        logger.info(f"⏱️  {func_name}: {elapsed:.2f}ms")
+        _record(func_name, time.perf_counter_ns() - start_time)
         return result
     return wrapper
 
 
-def profile_section(name: str):
+class _ProfileSection:
+    """Context manager returned by profile_section()."""
+    __slots__ = ('name', 'start_time')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start_time = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _record(self.name, time.perf_counter_ns() - self.start_time)
+
+
+def profile_section(name: str) -> _ProfileSection:
     """Context manager to profile a code section."""
-    class ProfileSection:
-        def __enter__(self):
-            self.start_time = time.perf_counter()
-            return self
-        
-        def __exit__(self, exc_type, exc_val, exc_tb):
-            end_time = time.perf_counter()
-            elapsed = (end_time - self.start_time) * 1000
-            
-            if name not in timing_data:
-                timing_data[name] = []
-            timing_data[name].append(elapsed)
-            
-            logger.info(f"⏱️  {name}: {elapsed:.2f}ms")
-    
-    return ProfileSection()
+    return _ProfileSection(name)
 
 
 def get_timing_stats():
-    """Get statistics for all profiled functions."""
+    """
+    Get statistics for all profiled functions.
+
+    count/total_ms/avg_ms cover every call; min_ms/max_ms cover the most
+    recent RING_SIZE samples. Timings are recorded in ns and converted here.
+    """
     stats = {}
-    for func_name, times in timing_data.items():
-        if times:
+    for func_name, timings in timing_data.items():
+        if timings.count:
+            recent = timings.samples()
             stats[func_name] = {
-                'count': len(times),
-                'total_ms': sum(times),
-                'avg_ms': sum(times) / len(times),
-                'min_ms': min(times),
-                'max_ms': max(times)
+                'count': timings.count,
+                'total_ms': timings.total / 1e6,
+                'avg_ms': timings.total / timings.count / 1e6,
+                'min_ms': min(recent) / 1e6,
+                'max_ms': max(recent) / 1e6
             }
     return stats
 
@@ -8,6 +8,7 @@ from chess_metrics.engine.fen import parse_fen
 from chess_metrics.engine.search import choose_best_move, Profile, clear_transposition_table
 from chess_metrics.engine.apply import apply_move
 from chess_metrics.engine.types import PIECE_VALUE
+from chess_metrics.engine.numpy_metrics import count_kinds_numpy
 
 # Test with offense-first profile (most likely to blunder)
 profile = Profile(name='offense-first', wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5)
@@ -25,10 +26,8 @@ for move_num in range(1, 6):
     side_name = "White" if state.side_to_move == 1 else "Black"
     print(f'\nMove {move_num} ({side_name} to move):')
     
-    # Count material before move
-    material_before = {}
-    for piece_val in range(1, 7):
-        material_before[piece_val] = sum(1 for p in state.board if abs(p) == piece_val)
+    # Count material before move (indexed by piece kind)
+    material_before = count_kinds_numpy(state.board)
     
     # Get AI move
     move = choose_best_move(state, profile, depthN=2)
@@ -43,14 +42,12 @@ for move_num in range(1, 6):
     undo_info = apply_move(state, move)
     
     # Count material after move
-    material_after = {}
-    for piece_val in range(1, 7):
-        material_after[piece_val] = sum(1 for p in state.board if abs(p) == piece_val)
+    material_after = count_kinds_numpy(state.board)
     
     # Check for material loss
     material_lost = 0
     for piece_val in range(1, 7):
-        diff = material_before[piece_val] - material_after[piece_val]
+        diff = int(material_before[piece_val] - material_after[piece_val])
         if diff > 0:
             material_lost += diff * PIECE_VALUE[piece_val]
             piece_names = {1: 'Pawn', 2: 'Knight', 3: 'Bishop', 4: 'Rook', 5: 'Queen', 6: 'King'}
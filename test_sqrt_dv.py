@@ -2,11 +2,10 @@
 """Test the square root DV calculation."""
 
 import sys
-import math
 sys.path.insert(0, 'src')
 
 from chess_metrics.engine.fen import parse_fen
-from chess_metrics.engine.metrics import compute_metrics
+from chess_metrics.engine.metrics import compute_metrics, SQRT_PV
 from chess_metrics.engine.movegen import generate_legal_moves
 from chess_metrics.cli import analyze_moves
 
@@ -26,7 +25,7 @@ def test_piece_value_sqrt():
     
     # White has: Queen(9), Rook(5), Pawn(1)
     # Expected DV: sqrt(9) + sqrt(5) + sqrt(1) = 3.0 + 2.236 + 1.0 = 6.236
-    expected_dv_w = math.sqrt(9) + math.sqrt(5) + math.sqrt(1)
+    expected_dv_w = SQRT_PV[9] + SQRT_PV[5] + SQRT_PV[1]
     
     print(f"Position: {fen}")
     print(f"White pieces: Queen(9), Rook(5), Pawn(1)")
@@ -59,7 +58,7 @@ def test_dv_comparison():
     
     for name, value in pieces:
         old_dv = value
-        new_dv = math.sqrt(value)
+        new_dv = SQRT_PV[value]
         reduction = (1 - new_dv/old_dv) * 100
         print(f"{name:<10} {value:>6} {old_dv:>8.0f} {new_dv:>10.3f} {reduction:>11.1f}%")
     
@@ -0,0 +1,33 @@
+"""
+Shared database setup for the tests.
+
+Migrating a fresh database and inserting the default profiles is the slow
+part of most DB tests, so it is done once per process into a template; each
+test gets its own page-level copy, so Repo methods that commit stay isolated.
+"""
+import atexit
+from typing import Optional
+
+from chess_metrics.db.repo import Repo, MEMORY_PATH
+
+_template: Optional[Repo] = None
+
+
+def _close_template() -> None:
+    global _template
+    if _template is not None:
+        _template.close()
+        _template = None
+
+
+def migrated_memory_repo() -> Repo:
+    """Fresh in-memory Repo with the schema and default profiles. The caller closes it."""
+    global _template
+    if _template is None:
+        _template = Repo.open(MEMORY_PATH)
+        _template.migrate()
+        _template.ensure_default_profiles()
+        atexit.register(_close_template)
+    repo = Repo.open(MEMORY_PATH)
+    _template.conn.backup(repo.conn)
+    return repo
@@ -0,0 +1,66 @@
+import unittest
+from chess_metrics.analysis import (
+    METRIC_KEYS, detect_blunders, find_critical_positions, calculate_statistics, metrics_matrix
+)
+
+def pos(ply, san="?", **metrics):
+    """Position dict with every metric at 10 unless given."""
+    p = {"ply": ply, "fen": f"fen{ply}", "last_move_san": san}
+    p.update({k: metrics.get(k, 10.0) for k in METRIC_KEYS})
+    return p
+
+class TestAnalysis(unittest.TestCase):
+    def test_tie_picks_first_metric(self):
+        # White's PV and MV drop by the same amount: PV comes first
+        positions = [pos(0), pos(1, "e4", pv_w=-10.0, mv_w=-10.0)]
+        [b] = detect_blunders(positions)
+        self.assertEqual(("white", "PV", -20.0, "blunder"), (b.side, b.metric, b.delta, b.severity))
+
+        # Black's OV and DV tie, MV lost less: OV wins
+        positions = [pos(1), pos(2, "e5", mv_b=4.0, ov_b=0.0, dv_b=0.0)]
+        [b] = detect_blunders(positions)
+        self.assertEqual(("black", "OV", -10.0, "mistake"), (b.side, b.metric, b.delta, b.severity))
+
+    def test_blunder_thresholds_are_inclusive(self):
+        cases = [(-15.0, "blunder"), (-10.0, "mistake"), (-5.0, "inaccuracy")]
+        for delta, severity in cases:
+            positions = [pos(0), pos(1, pv_w=10.0 + delta)]
+            [b] = detect_blunders(positions)
+            self.assertEqual((delta, severity), (b.delta, b.severity))
+        self.assertEqual([], detect_blunders([pos(0), pos(1, pv_w=5.5)]))
+
+    def test_critical_thresholds_are_inclusive(self):
+        positions = [pos(0), pos(1, pv_w=40.0), pos(2, pv_w=20.0), pos(3, pv_w=0.1)]
+        reasons = [(c.ply, c.reason) for c in find_critical_positions(positions)]
+        # ply 1: peak (40) and swing (+30); ply 2: swing of exactly -20;
+        # ply 3: swing of 19.9 is below the threshold
+        self.assertEqual([(1, "peak_value"), (1, "turning_point"), (2, "turning_point")], reasons)
+
+    def test_empty_and_single_position(self):
+        self.assertEqual([], detect_blunders([]))
+        self.assertEqual([], find_critical_positions([]))
+        self.assertEqual(0, calculate_statistics([], []).total_moves)
+        self.assertEqual((0, 8), metrics_matrix([]).shape)
+
+        single = [pos(0, pv_w=39.0, pv_b=41.0)]
+        self.assertEqual([], detect_blunders(single))
+        self.assertEqual([(0, "peak_value")],
+                         [(c.ply, c.reason) for c in find_critical_positions(single)])
+        stats = calculate_statistics(single, [])
+        self.assertEqual((1, 39.0, 41.0, []),
+                         (stats.total_moves, stats.avg_pv_white, stats.avg_pv_black, stats.turning_points))
+
+    def test_prebuilt_metrics_give_same_results(self):
+        positions = [pos(0), pos(1, "e4", ov_w=-20.0), pos(2, "e5", dv_b=45.0),
+                     pos(3, "Nf3", mv_w=3.0), pos(4, "Nc6", pv_b=-8.0)]
+        m = metrics_matrix(positions)
+        blunders = detect_blunders(positions)
+        self.assertEqual(blunders, detect_blunders(positions, metrics=m))
+        self.assertEqual(find_critical_positions(positions),
+                         find_critical_positions(positions, metrics=m))
+        self.assertEqual(calculate_statistics(positions, blunders),
+                         calculate_statistics(positions, blunders, metrics=m))
+        self.assertEqual(["OV", "MV", "PV"], [b.metric for b in blunders])
+
+if __name__ == "__main__":
+    unittest.main()
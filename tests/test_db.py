@@ -1,63 +1,123 @@
 ﻿import os
+import sqlite3
 import unittest
 import tempfile
 
 from chess_metrics.db.repo import Repo
-from chess_metrics.engine.fen import parse_fen, to_fen
+from chess_metrics.db.pool import RepoPool
+from chess_metrics.engine.fen import START_FEN, START_STATE, to_fen_incremental
 from chess_metrics.engine.metrics import compute_metrics
 from chess_metrics.engine.movegen import generate_legal_moves
 from chess_metrics.engine.apply import apply_move, undo_move
 from chess_metrics.engine.san import move_to_san
+from chess_metrics.engine.types import alg_to_sq
 
-START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+from db_helpers import migrated_memory_repo
+
+E2, E4 = alg_to_sq("e2"), alg_to_sq("e4")
 
 class TestDB(unittest.TestCase):
+    def migrated_repo(self) -> Repo:
+        repo = migrated_memory_repo()
+        self.addCleanup(repo.close)
+        return repo
+
     def test_store_two_plies(self):
+        repo = self.migrated_repo()
+
+        w = repo.create_player("W", "human")
+        b = repo.create_player("B", "ai")
+        gid = repo.create_game(w, b, START_FEN)
+
+        s = START_STATE.clone()
+        m0 = compute_metrics(s)
+        positions = [(gid, 0, "W", START_FEN, None, None,
+                      m0.pv_w, m0.mv_w, m0.ov_w, m0.dv_w,
+                      m0.pv_b, m0.mv_b, m0.ov_b, m0.dv_b)]
+
+        # make one legal move e2e4
+        legal = generate_legal_moves(s, s.side_to_move)
+        mv = next(x for x in legal if x.from_sq == E2 and x.to_sq == E4)
+        san = move_to_san(s, mv)
+        u = apply_move(s, mv)
+        fen1 = to_fen_incremental(START_FEN, mv, u)
+        m1 = compute_metrics(s)
+
+        moves = [(gid, 1, mv.uci(), san, "e2", "e4",
+                  1 if (mv.is_capture or mv.is_ep) else 0,
+                  1 if mv.is_ep else 0,
+                  1 if mv.is_castle else 0,
+                  1 if mv.is_promotion else 0,
+                  "Q" if mv.is_promotion else None,
+                  1.0)]  # variance_factor
+
+        positions.append((gid, 1, "B", fen1, mv.uci(), san,
+                          m1.pv_w, m1.mv_w, m1.ov_w, m1.dv_w,
+                          m1.pv_b, m1.mv_b, m1.ov_b, m1.dv_b))
+
+        # One executemany per table, committed as a single transaction
+        with repo.conn:
+            repo.insert_positions_many(positions)
+            repo.insert_moves_many(moves)
+
+        tl = repo.timeline(gid)
+        self.assertEqual(len(tl), 2)
+        self.assertEqual(tl[0]["ply"], 0)
+        self.assertEqual(tl[1]["ply"], 1)
+
+        undo_move(s, u)
+
+    def test_pool_reuses_read_only_connections(self):
+        # On disk on purpose: covers migrate against a real file, WAL and mode=ro
         with tempfile.TemporaryDirectory() as td:
-            dbp = os.path.join(td, "t.sqlite")
-            repo = Repo.open(dbp)
-            repo.migrate()
-            repo.ensure_default_profiles()
-
-            w = repo.create_player("W", "human")
-            b = repo.create_player("B", "ai")
-            gid = repo.create_game(w, b, START_FEN)
-
-            s = parse_fen(START_FEN)
-            m0 = compute_metrics(s)
-            repo.insert_position(gid, 0, "W", START_FEN, None, None,
-                                 m0.pv_w, m0.mv_w, m0.ov_w, m0.dv_w,
-                                 m0.pv_b, m0.mv_b, m0.ov_b, m0.dv_b)
-
-            # make one legal move e2e4
-            legal = generate_legal_moves(s, s.side_to_move)
-            mv = next(x for x in legal if x.uci() == "e2e4")
-            san = move_to_san(s, mv)
-            u = apply_move(s, mv)
-            fen1 = to_fen(s)
-            m1 = compute_metrics(s)
-
-            repo.insert_move(gid, 1, mv.uci(), san, "e2", "e4",
-                             1 if (mv.is_capture or mv.is_ep) else 0,
-                             1 if mv.is_ep else 0,
-                             1 if mv.is_castle else 0,
-                             1 if mv.is_promotion else 0,
-                             "Q" if mv.is_promotion else None,
-                             1.0)  # variance_factor
-
-            repo.insert_position(gid, 1, "B", fen1, mv.uci(), san,
-                                 m1.pv_w, m1.mv_w, m1.ov_w, m1.dv_w,
-                                 m1.pv_b, m1.mv_b, m1.ov_b, m1.dv_b)
-
-            repo.commit()
-
-            tl = repo.timeline(gid)
-            self.assertEqual(len(tl), 2)
-            self.assertEqual(tl[0]["ply"], 0)
-            self.assertEqual(tl[1]["ply"], 1)
-
-            undo_move(s, u)
-            repo.close()
+            pool = RepoPool(os.path.join(td, "t.sqlite"), size=2)
+            with pool.writer() as repo:
+                repo.migrate()
+                repo.ensure_default_profiles()
+                self.assertEqual(repo.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+            with pool.reader() as r1:
+                pass
+            with pool.reader() as r2:
+                self.assertIs(r1, r2)
+                self.assertEqual(r2.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0], 5)
+                with self.assertRaises(sqlite3.OperationalError):
+                    r2.conn.execute("DELETE FROM profiles")
+            pool.close()
+
+    def test_analysis_payload_keyed_by_positions_version(self):
+        repo = self.migrated_repo()
+        gid = repo.create_game(repo.create_player("W", "ai"), repo.create_player("B", "ai"), START_FEN)
+        repo.insert_position(gid, 0, "W", START_FEN, None, None, 39, 20, 0, 0.0, 39, 20, 0, 0.0)
+        repo.commit()
+
+        version = repo.positions_version(gid)
+        repo.save_analysis_payload(gid, version, b'{"blunders":[]}')
+        self.assertEqual(repo.get_analysis_payload(gid, version), b'{"blunders":[]}')
+
+        repo.insert_position(gid, 1, "B", START_FEN, None, None, 39, 20, 0, 0.0, 39, 20, 0, 0.0)
+        repo.commit()
+        self.assertIsNone(repo.get_analysis_payload(gid, repo.positions_version(gid)))
+
+    def test_delete_game_with_stored_analysis(self):
+        repo = self.migrated_repo()
+        w, b = repo.create_player("W", "ai"), repo.create_player("B", "ai")
+        gid = repo.create_game(w, b, START_FEN)
+        repo.insert_position(gid, 0, "W", START_FEN, None, None, 39, 20, 0, 0.0, 39, 20, 0, 0.0)
+        repo.commit()
+        version = repo.positions_version(gid)
+        repo.save_analysis_payload(gid, version, b'{"blunders":[]}')
+
+        repo.delete_game(gid)
+        self.assertIsNone(repo.get_game_for_analysis(gid))
+        self.assertEqual(repo.conn.execute("SELECT COUNT(*) FROM game_analysis").fetchone()[0], 0)
+
+        # The id is reused by the next game; its version must not match the old one
+        gid2 = repo.create_game(w, b, START_FEN)
+        repo.insert_position(gid2, 0, "W", START_FEN, None, None, 39, 20, 0, 0.0, 39, 20, 0, 0.0)
+        repo.commit()
+        self.assertEqual(gid2, gid)
+        self.assertNotEqual(repo.positions_version(gid2), version)
 
 if __name__ == "__main__":
     unittest.main()
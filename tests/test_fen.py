@@ -1,5 +1,8 @@
-﻿import unittest
-from chess_metrics.engine.fen import parse_fen, to_fen
+﻿import random
+import unittest
+from chess_metrics.engine.fen import parse_fen, to_fen, to_fen_incremental, START_FEN, START_STATE
+from chess_metrics.engine.movegen import generate_legal_moves
+from chess_metrics.engine.apply import apply_move
 
 class TestFEN(unittest.TestCase):
     def test_roundtrip_start(self):
@@ -13,5 +16,29 @@ class TestFEN(unittest.TestCase):
         s = parse_fen(fen)
         self.assertEqual(fen, to_fen(s))
 
+    def test_clone_is_independent(self):
+        s = START_STATE.clone()
+        apply_move(s, generate_legal_moves(s, s.side_to_move)[0])
+        self.assertNotEqual(START_FEN, to_fen(s))
+        self.assertEqual(START_FEN, to_fen(START_STATE))
+        self.assertEqual([], START_STATE.undo_stack)
+
+    def test_incremental_matches_full(self):
+        # Random games from a position with castling, ep and promotions available
+        rng = random.Random(7)
+        kiwipete = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        for fen in (START_FEN, kiwipete) * 10:
+            s = parse_fen(fen)
+            prev = fen
+            for _ in range(80):
+                legal = generate_legal_moves(s, s.side_to_move)
+                if not legal:
+                    break
+                m = rng.choice(legal)
+                u = apply_move(s, m)
+                full = to_fen(s)
+                self.assertEqual(full, to_fen_incremental(prev, m, u), m.uci())
+                prev = full
+
 if __name__ == "__main__":
     unittest.main()
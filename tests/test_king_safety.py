@@ -5,11 +5,18 @@ import sys
 sys.path.insert(0, 'src')
 
 from chess_metrics.engine.fen import parse_fen
-from chess_metrics.engine.search import choose_best_move, Profile, clear_transposition_table
+from chess_metrics.engine.search import choose_best_move, Profile
 from chess_metrics.engine.material_safety import evaluate_king_safety
-from chess_metrics.engine.movegen import generate_legal_moves
-from chess_metrics.engine.types import Move
+from chess_metrics.engine.movegen import generate_legal_moves, generate_king_moves
+from chess_metrics.engine.types import Move, KING
 
+# Profiles used by test_no_early_king_moves and test_all_profiles_avoid_early_king_moves
+PROFILES = (
+    Profile(name='materialist', wPV=2.0, wMV=1.0, wOV=1.0, wDV=1.0),
+    Profile(name='defense-first', wPV=1.0, wMV=1.0, wOV=0.5, wDV=2.0),
+    Profile(name='offense-first', wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5),
+    Profile(name='board-coverage', wPV=1.0, wMV=2.0, wOV=1.0, wDV=1.0),
+)
 
 def test_no_early_king_moves():
     """Test that AI doesn't move king in opening without good reason."""
@@ -19,10 +26,9 @@ def test_no_early_king_moves():
     state = parse_fen(fen)
     
     # Test with board-coverage profile (most likely to make king moves for mobility)
-    profile = Profile(name='board-coverage', wPV=1.0, wMV=2.0, wOV=1.0, wDV=1.0)
+    profile = next(p for p in PROFILES if p.name == 'board-coverage')
     
-    clear_transposition_table()
-    move = choose_best_move(state, profile, depthN=2)
+    move = choose_best_move(state, profile, depthN=2, tt={})
     
     assert move is not None, "AI should find a legal move"
     
@@ -35,16 +41,11 @@ def test_no_early_king_moves():
 
 def test_king_safety_penalties():
     """Test that king moves in opening are heavily penalized."""
-    # Starting position
-    fen = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'
-    state = parse_fen(fen)
-    
     # After 1.e4, white has king moves available
     state = parse_fen('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 1')
     
     # Find king moves
-    legal_moves = generate_legal_moves(state, state.side_to_move)
-    king_moves = [m for m in legal_moves if m.moving_kind == 6]
+    king_moves = generate_king_moves(state, state.side_to_move)
     
     # There should be king moves available (Ke2)
     assert len(king_moves) > 0, "Should have king moves available"
@@ -64,10 +65,10 @@ def test_castling_not_penalized():
     state = parse_fen(fen)
     
     # Find castling move (O-O = e1g1)
-    legal_moves = generate_legal_moves(state, state.side_to_move)
+    legal_moves = generate_legal_moves(state, state.side_to_move, kind_mask=1 << KING)
     castling_move = None
     for m in legal_moves:
-        if m.moving_kind == 6 and abs(m.from_sq - m.to_sq) == 2:
+        if abs(m.from_sq - m.to_sq) == 2:
             castling_move = m
             break
     
@@ -105,16 +106,8 @@ def test_all_profiles_avoid_early_king_moves():
     fen = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
     state = parse_fen(fen)
     
-    profiles = [
-        Profile(name='materialist', wPV=2.0, wMV=1.0, wOV=1.0, wDV=1.0),
-        Profile(name='defense-first', wPV=1.0, wMV=1.0, wOV=0.5, wDV=2.0),
-        Profile(name='offense-first', wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5),
-        Profile(name='board-coverage', wPV=1.0, wMV=2.0, wOV=1.0, wDV=1.0),
-    ]
-    
-    for profile in profiles:
-        clear_transposition_table()
-        move = choose_best_move(state, profile, depthN=2)
+    for profile in PROFILES:
+        move = choose_best_move(state, profile, depthN=2, tt={})
         
         assert move is not None, f"{profile.name} should find a legal move"
         
@@ -123,28 +116,13 @@ def test_all_profiles_avoid_early_king_moves():
 
 
 if __name__ == '__main__':
-    print("Running king safety tests...")
-    
-    print("Test 1: No early king moves...")
-    test_no_early_king_moves()
-    print("  ✅ PASS")
-    
-    print("Test 2: King safety penalties...")
-    test_king_safety_penalties()
-    print("  ✅ PASS")
-    
-    print("Test 3: Castling not over-penalized...")
-    test_castling_not_penalized()
-    print("  ✅ PASS")
-    
-    print("Test 4: King exposure detection...")
-    test_king_exposure_detection()
-    print("  ✅ PASS")
-    
-    print("Test 5: All profiles avoid early king moves...")
-    test_all_profiles_avoid_early_king_moves()
-    print("  ✅ PASS")
-    
-    print()
-    print("All king safety tests passed! ✅")
-
+    tests = [
+        test_no_early_king_moves,
+        test_king_safety_penalties,
+        test_castling_not_penalized,
+        test_king_exposure_detection,
+        test_all_profiles_avoid_early_king_moves,
+    ]
+    for test in tests:
+        test()
+    print(f"All {len(tests)} king safety tests passed")
@@ -9,23 +9,28 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from chess_metrics.engine.fen import parse_fen
-from chess_metrics.engine.search import choose_best_move, Profile, clear_transposition_table
+from chess_metrics.engine.search import choose_best_move, Profile
 from chess_metrics.engine.material_safety import (
     evaluate_material_safety, 
     is_piece_defended,
     evaluate_hanging_pieces
 )
 from chess_metrics.engine.movegen import generate_legal_moves
-from chess_metrics.engine.types import WHITE, BLACK
+from chess_metrics.engine.types import WHITE, BLACK, QUEEN
 from chess_metrics.engine.apply import apply_move, undo_move
 
 
+# Profiles used by test_no_queen_blunder_opening and test_profile_material_awareness
+PROFILES = (
+    Profile(name="materialist", wPV=2.0, wMV=1.0, wOV=0.5, wDV=1.0),
+    Profile(name="offense-first", wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5),
+    Profile(name="defense-first", wPV=1.0, wMV=0.5, wOV=0.5, wDV=2.0),
+    Profile(name="default", wPV=1.0, wMV=1.0, wOV=1.0, wDV=1.0),
+)
+
+
 class TestMaterialSafety(unittest.TestCase):
     
-    def setUp(self):
-        """Clear caches before each test."""
-        clear_transposition_table()
-    
     def test_no_queen_blunder_opening(self):
         """Test that AI doesn't lose queen in the opening."""
         # After 1.e4, black should not play moves that lose the queen
@@ -33,20 +38,16 @@ class TestMaterialSafety(unittest.TestCase):
         state = parse_fen(fen)
         
         # Test with offense-first profile (most likely to blunder)
-        profile = Profile(name="offense-first", wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5)
+        profile = next(p for p in PROFILES if p.name == "offense-first")
         
-        move = choose_best_move(state, profile, depthN=2)
+        move = choose_best_move(state, profile, depthN=2, tt={})
         
         # Apply the move and check that queen is not lost
         if move:
             undo_info = apply_move(state, move)
             
             # Check that black's queen is still on the board
-            queen_found = False
-            for sq, piece in enumerate(state.board):
-                if piece == BLACK * 5:  # Black queen
-                    queen_found = True
-                    break
+            queen_found = BLACK * QUEEN in state.board
             
             undo_move(state, undo_info)
             
@@ -104,16 +105,8 @@ class TestMaterialSafety(unittest.TestCase):
         fen = "rnbqkb1r/pppp1ppp/5n2/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 1"
         state = parse_fen(fen)
         
-        profiles = [
-            Profile(name="materialist", wPV=2.0, wMV=1.0, wOV=0.5, wDV=1.0),
-            Profile(name="offense-first", wPV=1.0, wMV=1.0, wOV=2.0, wDV=0.5),
-            Profile(name="defense-first", wPV=1.0, wMV=0.5, wOV=0.5, wDV=2.0),
-            Profile(name="default", wPV=1.0, wMV=1.0, wOV=1.0, wDV=1.0),
-        ]
-        
-        for profile in profiles:
-            clear_transposition_table()
-            move = choose_best_move(state, profile, depthN=2)
+        for profile in PROFILES:
+            move = choose_best_move(state, profile, depthN=2, tt={})
             
             # Move should not be None
             self.assertIsNotNone(move, f"Profile {profile.name} returned no move")
@@ -122,9 +115,9 @@ class TestMaterialSafety(unittest.TestCase):
             if move:
                 undo_info = apply_move(state, move)
                 
-                # Count material for both sides
-                white_material = sum(abs(p) for p in state.board if p > 0)
-                black_material = sum(abs(p) for p in state.board if p < 0)
+                # Count material for both sides (board.count runs in C)
+                white_material = sum(k * state.board.count(k) for k in range(1, 7))
+                black_material = sum(k * state.board.count(-k) for k in range(1, 7))
                 
                 undo_move(state, undo_info)
                 
@@ -1,6 +1,7 @@
 ﻿import unittest
 from chess_metrics.engine.fen import parse_fen
-from chess_metrics.engine.metrics import compute_metrics, deltas
+from chess_metrics.engine.metrics import compute_metrics, compute_metrics_unified, deltas
+from chess_metrics.engine.metrics_numba import compute_metrics_numba
 
 class TestMetrics(unittest.TestCase):
     def test_worked_example_p0(self):
@@ -33,5 +34,17 @@ class TestMetrics(unittest.TestCase):
         dPV, dMV, dOV, dDV = deltas(m)
         self.assertGreaterEqual(dOV, 1)
 
+    def test_numba_kernel_matches_unified(self):
+        fens = [
+            "3r2k1/8/8/2p5/3P4/8/3R4/3Q2K1 w - - 0 1",
+            "8/8/8/3pP3/8/8/8/4K2k w - d6 0 1",
+            # Kiwipete (castling both sides, pins) and a promotion-heavy position
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+            "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        ]
+        for fen in fens:
+            s = parse_fen(fen)
+            self.assertEqual(compute_metrics_unified(s), compute_metrics_numba(s), fen)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,30 +1,86 @@
 ﻿import unittest
-from chess_metrics.engine.fen import parse_fen
-from chess_metrics.engine.movegen import generate_legal_moves
+from chess_metrics.engine.fen import parse_fen, START_STATE
+from chess_metrics.engine.movegen import (
+    generate_legal_moves, generate_legal_captures, generate_legal_moves_into, generate_king_moves,
+    MAX_MOVES
+)
 from chess_metrics.engine.apply import apply_move, undo_move
+from chess_metrics.engine.perft_nb import perft_numba
+from chess_metrics.engine.types import Move, KNIGHT, KING
 
-def perft(state, depth):
+def perft(state, depth, buffers=None):
     if depth == 0:
         return 1
-    side = state.side_to_move
-    moves = generate_legal_moves(state, side)
+    # One move buffer per ply, reused by every node at that ply
+    if buffers is None:
+        buffers = [[None] * MAX_MOVES for _ in range(depth + 1)]
+    moves = buffers[depth]
+    n = generate_legal_moves_into(state, state.side_to_move, moves)
     if depth == 1:
-        return len(moves)
+        return n
     total = 0
-    for m in moves:
-        u = apply_move(state, m)
-        total += perft(state, depth-1)
+    for i in range(n):
+        u = apply_move(state, moves[i])
+        total += perft(state, depth-1, buffers)
         undo_move(state, u)
     return total
 
+# Parsed once; each test clones before moving pieces
+KIWIPETE = parse_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+
 class TestPerft(unittest.TestCase):
     def test_startpos_depth1(self):
-        s = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        s = START_STATE.clone()
         self.assertEqual(perft(s, 1), 20)
 
     def test_startpos_depth2(self):
-        s = parse_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        s = START_STATE.clone()
         self.assertEqual(perft(s, 2), 400)
 
+    def test_kiwipete_depth2(self):
+        self.assertEqual(perft(KIWIPETE.clone(), 2), 2039)
+
+    def test_numba_perft_matches_python(self):
+        # En passant, promotions, castling through and out of check
+        fens = [
+            "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+            "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        ]
+        self.assertEqual(perft_numba(START_STATE, 3), 8902)
+        self.assertEqual(perft_numba(KIWIPETE, 2), 2039)
+        for fen in fens:
+            s = parse_fen(fen)
+            self.assertEqual(perft(s.clone(), 3), perft_numba(s, 3), fen)
+
+    def test_moves_into_matches_legal_moves(self):
+        s = KIWIPETE.clone()
+        buf = [None] * MAX_MOVES
+        n = generate_legal_moves_into(s, s.side_to_move, buf, 3)
+        expected = generate_legal_moves(s, s.side_to_move)
+        self.assertEqual(len(expected), n)
+        self.assertEqual(sorted(expected, key=Move.uci), expected)
+        self.assertEqual(sorted(expected, key=Move.uci), sorted(buf[3:3 + n], key=Move.uci))
+
+    def test_legal_captures_match_filtered_legal_moves(self):
+        # Kiwipete: captures, en passant-free but with pins and castling
+        s = KIWIPETE.clone()
+        expected = [m for m in generate_legal_moves(s, s.side_to_move) if m.is_capture]
+        self.assertEqual(expected, generate_legal_captures(s, s.side_to_move))
+
+    def test_kind_mask_matches_filtered_legal_moves(self):
+        s = KIWIPETE.clone()
+        moves = generate_legal_moves(s, s.side_to_move)
+        for mask in (1 << KING, 1 << KNIGHT, (1 << KING) | (1 << KNIGHT)):
+            expected = [m for m in moves if mask & (1 << m.moving_kind)]
+            self.assertEqual(expected, generate_legal_moves(s, s.side_to_move, kind_mask=mask))
+        self.assertEqual(generate_legal_moves(s, s.side_to_move, kind_mask=1 << KING),
+                         generate_king_moves(s, s.side_to_move))
+
+    def test_packed_move_roundtrip(self):
+        s = KIWIPETE.clone()
+        for m in generate_legal_moves(s, s.side_to_move):
+            self.assertEqual(m, Move.unpack(m.pack()))
+            self.assertIs(m.uci(), m.uci())
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,67 @@
+﻿import unittest
+from chess_metrics.engine.fen import START_FEN, START_STATE, parse_fen, to_fen
+from chess_metrics.engine.movegen import generate_legal_moves
+from chess_metrics.engine import search
+from chess_metrics.engine.search import choose_best_move, Profile, clear_transposition_table
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        clear_transposition_table()
+
+    def test_parallel_root_search_matches_serial(self):
+        s = START_STATE.clone()
+        prof = Profile(name="default")
+        serial = choose_best_move(s, prof, depthN=2, use_iterative_deepening=False)
+        clear_transposition_table()
+        parallel = choose_best_move(s, prof, depthN=2, use_iterative_deepening=False, parallel=True)
+        self.assertEqual(serial.uci(), parallel.uci())
+        self.assertEqual(START_FEN, to_fen(s))
+
+    def test_shutdown_root_pool(self):
+        choose_best_move(START_STATE.clone(), Profile(name="default"), depthN=2,
+                         use_iterative_deepening=False, parallel=True)
+        search.shutdown_root_pool()
+        self.assertIsNone(search._root_pool)
+        search.shutdown_root_pool()  # no pool left: nothing to do
+
+    def test_parallel_iterative_deepening_returns_legal_move(self):
+        s = START_STATE.clone()
+        mv = choose_best_move(s, Profile(name="default"), depthN=2, parallel=True)
+        legal = [m.uci() for m in generate_legal_moves(s, s.side_to_move)]
+        self.assertIn(mv.uci(), legal)
+
+    def test_private_tt_leaves_shared_table_alone(self):
+        s = START_STATE.clone()
+        tt = {}
+        mv = choose_best_move(s, Profile(name="default"), depthN=2, tt=tt)
+        self.assertIsNotNone(mv)
+        self.assertTrue(tt)
+        self.assertEqual({}, search._transposition_table)
+        self.assertEqual({}, search._killer_moves)
+        self.assertEqual({}, search._history_scores)
+
+    def test_private_tt_leaves_shared_ordering_tables_alone(self):
+        # Killer/history entries from an earlier search must neither steer
+        # an isolated search nor be overwritten by it
+        search._killer_moves[1] = [0]
+        search._history_scores[0] = 1
+        mv = choose_best_move(START_STATE.clone(), Profile(name="default"), depthN=3, tt={})
+        self.assertIsNotNone(mv)
+        self.assertEqual({1: [0]}, search._killer_moves)
+        self.assertEqual({0: 1}, search._history_scores)
+
+    def test_tied_scores_pick_same_move_from_warm_table(self):
+        # With all weights zero every root move scores 0, so the choice is
+        # made by the leaf-metric tie-breakers. A second search on the same
+        # table answers the root's children from TT entries, which must carry
+        # the same leaf metrics as the first search.
+        s = parse_fen("4k3/pppppppp/8/8/8/8/PPPPPPPP/4K3 w - - 0 1")
+        flat = Profile(name="flat", wPV=0.0, wMV=0.0, wOV=0.0, wDV=0.0)
+        tt = {}
+        first = choose_best_move(s, flat, depthN=3, use_iterative_deepening=False, tt=tt)
+        second = choose_best_move(s, flat, depthN=3, use_iterative_deepening=False, tt=tt)
+        self.assertEqual("b2b4", first.uci())
+        self.assertEqual("b2b4", second.uci())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+﻿import unittest
+from chess_metrics.engine.fen import parse_fen, START_STATE
+from chess_metrics.engine.movegen import generate_legal_moves
+from chess_metrics.engine.apply import apply_move, undo_move
+from chess_metrics.engine.zobrist import zobrist_hash, incremental_hash_move, hash_after_move
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental_matches_full_hash(self):
+        # Captures, castling-rights loss and an EP square that disappears
+        s = parse_fen("r3k2r/pppq1ppp/2n5/3pP3/8/2N5/PPPQ1PPP/R3K2R w KQkq d6 0 1")
+        h = zobrist_hash(s)
+        for mv in generate_legal_moves(s, s.side_to_move):
+            if mv.is_ep or mv.is_castle or mv.is_promotion:
+                continue
+            piece, captured = s.board[mv.from_sq], s.board[mv.to_sq]
+            cr, ep = s.castling_rights, s.ep_sq
+            u = apply_move(s, mv)
+            self.assertEqual(zobrist_hash(s),
+                             incremental_hash_move(h, s, mv.from_sq, mv.to_sq, piece, captured, cr, ep),
+                             mv.uci())
+            undo_move(s, u)
+
+        # Without the castling/EP arguments both are taken as unchanged
+        s = START_STATE.clone()
+        h = zobrist_hash(s)
+        mv = next(m for m in generate_legal_moves(s, s.side_to_move) if m.uci() == "g1f3")
+        apply_move(s, mv)
+        self.assertEqual(zobrist_hash(s), incremental_hash_move(h, s, mv.from_sq, mv.to_sq, s.board[mv.to_sq]))
+
+    def test_hash_after_move_matches_full_hash(self):
+        # Castling both ways, en passant (including after a double push at the
+        # first ply), promotions with and without capture, captured corner rooks
+        fens = [
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+            "r3k2r/1P4P1/8/3pP3/8/8/p6p/R3K2R w KQkq d6 0 1",
+        ]
+        seen = set()
+
+        def walk(s, h, depth):
+            for mv in generate_legal_moves(s, s.side_to_move):
+                seen.update(k for k in ("is_ep", "is_castle", "is_promotion") if getattr(mv, k))
+                u = apply_move(s, mv)
+                h2 = hash_after_move(h, s, u)
+                self.assertEqual(zobrist_hash(s), h2, mv.uci())
+                if depth > 1:
+                    walk(s, h2, depth - 1)
+                undo_move(s, u)
+
+        for fen in fens:
+            s = parse_fen(fen)
+            walk(s, zobrist_hash(s), 2)
+        self.assertEqual({"is_ep", "is_castle", "is_promotion"}, seen)
+
+if __name__ == "__main__":
+    unittest.main()